@@ -0,0 +1,412 @@
+"""Offline benchmark suite for the three services, with JSON results that can
+be compared between versions.
+
+Scenarios:
+
+* ``discord``: every ``DiscordClient`` method, called concurrently against
+  the Discord REST stub (``q1_discord_mcp/benchmarks/stub_discord.py``). The
+  stub sends ``X-RateLimit-*`` headers per route bucket. Each method gets a
+  fresh client, so results do not depend on the order methods run in. The
+  client's global limit is raised to ``--global-rate``, so the numbers show
+  the client and per-route scheduling rather than Discord's 50 requests/s.
+* ``plagiarism``: ``/analyze`` on synthetic text corpora of increasing size,
+  with a cold and a warm embedding cache, against the Ollama stub.
+* ``chunking``: ``/upload/`` with every chunking strategy, on synthetic PDFs
+  of increasing size, against the Ollama stub.
+
+The Ollama stub (``ollama_embeddings/stub.py``, shared by both backends)
+serves ``/api/embeddings`` and ``/api/embed``. It returns deterministic
+vectors after a configurable delay.
+
+For each scenario the suite records latency p50 and p99, throughput, and the
+peak of memory traced by ``tracemalloc``. Memory is traced on a separate
+run, so tracing does not slow the timed calls. The apps run in-process, so
+the trace covers the server side.
+
+Each project runs in its own subprocess, from its own directory, because the
+projects share module names such as ``main``.
+
+Usage (from the repository root):
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --projects chunking --quick --output after.json
+    python benchmarks/suite.py --compare before.json after.json --tolerance 0.2
+
+``--compare`` lists the scenarios whose latency, throughput or peak memory
+got worse by more than the tolerance, and exits with status 1 if there are
+any. Timings are only comparable between runs on the same idle machine. The
+median change across all scenarios is printed, since load on the machine
+slows every scenario alike. ``--relative`` discounts that change, so only
+scenarios that slowed down more than the rest are flagged.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECTS = {
+    "discord": "q1_discord_mcp",
+    "plagiarism": "q2_playiarism_detector/backend",
+    "chunking": "q3_chunking_statergy/backend",
+}
+CHUNKING_STRATEGIES = ("fixed", "recursive", "sentence", "document", "semantic")
+# Lower is better for these; throughput is the only higher-is-better metric.
+COMPARED = ("p50_ms", "p99_ms", "peak_memory_mb", "throughput_per_s")
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def result(project, name, params, latencies, wall, peak_bytes):
+    return {
+        "project": project,
+        "name": name,
+        "params": params,
+        "calls": len(latencies),
+        "seconds": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_memory_mb": round(peak_bytes / 2**20, 2),
+    }
+
+
+def measure(project, name, params, call, repeat, setup=None):
+    """Time ``repeat`` sequential calls (after one warm-up), then trace one more
+    for peak memory. ``setup`` runs before each call, outside the timing."""
+    if setup:
+        setup()
+    call()
+    latencies = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    if setup:
+        setup()
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result(project, name, params, latencies, sum(latencies), peak)
+
+
+async def measure_concurrent(project, name, params, call, calls, concurrency):
+    """Run ``calls`` calls of the coroutine function ``call(i)``, at most
+    ``concurrency`` at a time; then trace one more round for peak memory."""
+
+    async def run(count):
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(i):
+            async with semaphore:
+                started = time.perf_counter()
+                await call(i)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(i) for i in range(count)))
+        return latencies, time.perf_counter() - started
+
+    latencies, wall = await run(calls)
+    tracemalloc.start()
+    await run(calls)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result(project, name, params, latencies, wall, peak)
+
+
+# --- discord ------------------------------------------------------------------
+
+
+async def bench_discord(args):
+    from discord_client import DiscordClient
+    from ratelimit import RateLimiter
+    from stub_discord import start_stub
+
+    runner, base_url = await start_stub(latency=args.latency, bucket_limit=args.bucket_limit, bucket_window=1.0)
+    channels = [str(10**17 + i) for i in range(args.channels)]
+    message_ids = [str(2 * 10**17 + i) for i in range(100)]
+    methods = {
+        "send_message": lambda c, i: c.send_message(channels[i % len(channels)], f"message {i}"),
+        "get_channel_messages": lambda c, i: c.get_channel_messages(channels[i % len(channels)], limit=50),
+        "iter_channel_messages": lambda c, i: collect(c.iter_channel_messages(channels[i % len(channels)], limit=250)),
+        "get_channel": lambda c, i: c.get_channel(channels[i % len(channels)]),
+        "delete_message": lambda c, i: c.delete_message(channels[i % len(channels)], message_ids[i % 100]),
+        "bulk_delete_messages": lambda c, i: c.bulk_delete_messages(channels[i % len(channels)], message_ids),
+        "kick_user": lambda c, i: c.kick_user(channels[i % len(channels)], str(i)),
+        "ban_user": lambda c, i: c.ban_user(channels[i % len(channels)], str(i)),
+    }
+    params = {
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "bucket_limit": args.bucket_limit,
+        "global_rate": args.global_rate,
+    }
+    results = []
+    try:
+        for method, call in methods.items():
+            limiter = RateLimiter(global_rate=args.global_rate)
+            async with DiscordClient("stub-token", base_url=base_url, rate_limiter=limiter) as client:
+                results.append(
+                    await measure_concurrent(
+                        "discord", f"DiscordClient.{method}", params, lambda i: call(client, i), args.calls, args.concurrency
+                    )
+                )
+    finally:
+        await runner.cleanup()
+    return results
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+# --- plagiarism -----------------------------------------------------------------
+
+
+def text_corpus(n, words, rng):
+    vocabulary = [f"w{i}{'aeiou'[i % 5]}" for i in range(20000)]
+    return [" ".join(rng.choice(vocabulary) for _ in range(words)) for _ in range(n)]
+
+
+def bench_plagiarism(args):
+    from stub_ollama import StubServer
+
+    with StubServer(port=free_port(), latency=args.latency) as stub:
+        os.environ["OLLAMA_URL"] = stub.url
+        from fastapi.testclient import TestClient
+
+        import main as server
+        from embedding_cache import EmbeddingCache
+
+        def reset_cache():
+            server.embedding_cache = EmbeddingCache(None)
+
+        rng = random.Random(0)
+        results = []
+        with TestClient(server.app) as client:
+            for size in args.texts:
+                texts = text_corpus(size, 200, rng)
+                for cache, matrix in (("cold", "full"), ("warm", "full"), ("warm", "none")):
+                    body = {"texts": texts, "matrix": matrix, "unique_pairs": matrix == "none"}
+
+                    def call():
+                        client.post("/analyze", json=body).raise_for_status()
+
+                    params = {"texts": size, "matrix": matrix, "cache": cache, "latency": args.latency}
+                    setup = reset_cache if cache == "cold" else None
+                    results.append(measure("plagiarism", "/analyze", params, call, args.repeat, setup))
+    return results
+
+
+# --- chunking -------------------------------------------------------------------
+
+
+def bench_chunking(args):
+    from make_pdf import write_pdf
+    from stub_ollama import StubServer
+
+    with StubServer(port=free_port(), latency=args.latency) as stub, tempfile.TemporaryDirectory() as directory:
+        os.environ["OLLAMA_URL"] = stub.url
+        from fastapi.testclient import TestClient
+
+        import main as server
+        from document_cache import DocumentCache
+        from embedding_cache import EmbeddingCache
+
+        def reset_caches():
+            server.document_cache = DocumentCache(None)
+            server.embedding_cache = EmbeddingCache(None)
+
+        results = []
+        with TestClient(server.app) as client:
+            for pages in args.pages:
+                path = os.path.join(directory, f"{pages}.pdf")
+                write_pdf(path, pages)
+                with open(path, "rb") as f:
+                    pdf = f.read()
+                for strategy in CHUNKING_STRATEGIES:
+                    query = {"strategy": strategy, "chunk_size": 500, "overlap": 50 if strategy != "semantic" else 0}
+
+                    def call():
+                        response = client.post("/upload/", params=query, files={"file": ("sample.pdf", pdf, "application/pdf")})
+                        response.raise_for_status()
+                        if "error" in response.json():
+                            raise RuntimeError(response.json()["error"])
+
+                    params = {"pages": pages, **query, "latency": args.latency}
+                    # Cold caches, so every call extracts, chunks and (for semantic) embeds.
+                    results.append(measure("chunking", f"/upload/ {strategy}", params, call, args.repeat, reset_caches))
+    return results
+
+
+# --- driver ---------------------------------------------------------------------
+
+
+def run_project(name, args):
+    """In the project's subprocess: run its scenarios and write the results."""
+    directory = os.path.join(ROOT, PROJECTS[name])
+    sys.path[:0] = [directory, os.path.join(directory, "benchmarks")]
+    if name == "discord":
+        results = asyncio.run(bench_discord(args))
+    elif name == "plagiarism":
+        results = bench_plagiarism(args)
+    else:
+        results = bench_chunking(args)
+    with open(args.partial, "w") as f:
+        json.dump({"results": results, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}, f)
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args, passthrough):
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "quick": args.quick,
+        "peak_rss_mb": {},
+        "failed": [],
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as scratch:
+        # No disk caches or indexes from a previous run, and none left behind.
+        env = {
+            **os.environ,
+            "EMBED_CACHE_DIR": "",
+            "DOC_CACHE_DIR": "",
+            "CORPUS_INDEX_DIR": os.path.join(scratch, "corpus_index"),
+            "RAG_INDEX_DIR": os.path.join(scratch, "rag_index"),
+        }
+        for name in args.projects:
+            partial = os.path.join(scratch, f"{name}.json")
+            print(f"running {name}...", file=sys.stderr)
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-project", name, "--partial", partial, *passthrough],
+                cwd=os.path.join(ROOT, PROJECTS[name]), env=env,
+            )
+            if completed.returncode:
+                # E.g. a dependency missing for one project; still run the others.
+                print(f"{name} failed with status {completed.returncode}", file=sys.stderr)
+                report["failed"].append(name)
+                continue
+            with open(partial) as f:
+                data = json.load(f)
+            report["results"].extend(data["results"])
+            report["peak_rss_mb"][name] = round(data["peak_rss_mb"], 1)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{'scenario':<42} {'params':<54} {'p50 (ms)':>9} {'p99 (ms)':>9} {'per s':>8} {'peak MB':>8}")
+    for r in report["results"]:
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items() if k not in ("latency", "calls", "concurrency", "global_rate"))
+        print(
+            f"{r['project'] + ' ' + r['name']:<42} {params:<54} {r['p50_ms']:9.2f} {r['p99_ms']:9.2f} "
+            f"{r['throughput_per_s']:8.1f} {r['peak_memory_mb']:8.2f}"
+        )
+    print(f"wrote {args.output}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+def scenario_key(r):
+    return r["project"], r["name"], json.dumps(r["params"], sort_keys=True)
+
+
+def compare(before_path, after_path, tolerance, relative=False):
+    with open(before_path) as f:
+        before = {scenario_key(r): r for r in json.load(f)["results"]}
+    with open(after_path) as f:
+        after = {scenario_key(r): r for r in json.load(f)["results"]}
+    common = sorted(before.keys() & after.keys())
+    # A machine that is busier or slower makes every scenario slower alike;
+    # the median change shows that, and ``relative`` discounts it from timings.
+    ratios = [after[key]["p50_ms"] / before[key]["p50_ms"] for key in common if before[key]["p50_ms"]]
+    shift = percentile(ratios, 50) if ratios else 1.0
+    print(f"median p50 change across scenarios: {shift - 1:+.0%}")
+    regressions = 0
+    for key in common:
+        old, new = before[key], after[key]
+        for metric in COMPARED:
+            if not old[metric] or new[metric] is None:
+                continue
+            ratio = new[metric] / old[metric]
+            if relative and metric != "peak_memory_mb":
+                ratio = ratio * shift if metric == "throughput_per_s" else ratio / shift
+            change = ratio - 1
+            worse = change < -tolerance if metric == "throughput_per_s" else change > tolerance
+            if worse:
+                regressions += 1
+                print(f"REGRESSION {key[0]} {key[1]} {key[2]}: {metric} {old[metric]} -> {new[metric]} ({change:+.0%})")
+    for key in before.keys() - after.keys():
+        print(f"missing    {key[0]} {key[1]} {key[2]}")
+    print(f"{len(common)} scenarios compared, {regressions} regressions (tolerance {tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", nargs="+", choices=PROJECTS, default=list(PROJECTS))
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change before a metric counts as a regression.")
+    parser.add_argument("--relative", action="store_true", help="Compare timings after discounting the median change across scenarios.")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpora and fewer calls, for a fast check.")
+    parser.add_argument("--repeat", type=int, help="Timed calls per HTTP scenario (default 10, quick 3).")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the stubs add to every request.")
+    parser.add_argument("--texts", type=int, nargs="+", help="Corpus sizes for /analyze (default 50 200 1000, quick 20 100).")
+    parser.add_argument("--pages", type=int, nargs="+", help="PDF sizes for /upload/ (default 10 50 200, quick 5 20).")
+    parser.add_argument("--calls", type=int, help="Calls per DiscordClient method (default 200, quick 40).")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=10, help="Channels (and guilds) the Discord calls are spread over.")
+    parser.add_argument("--bucket-limit", type=int, default=100, help="Discord stub requests per bucket per second.")
+    parser.add_argument("--global-rate", type=float, default=1000.0, help="DiscordClient global requests per second.")
+    parser.add_argument("--run-project", choices=PROJECTS, help=argparse.SUPPRESS)
+    parser.add_argument("--partial", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(compare(*args.compare, args.tolerance, args.relative))
+    args.repeat = args.repeat or (3 if args.quick else 10)
+    args.texts = args.texts or ([20, 100] if args.quick else [50, 200, 1000])
+    args.pages = args.pages or ([5, 20] if args.quick else [10, 50, 200])
+    args.calls = args.calls or (40 if args.quick else 200)
+    if args.run_project:
+        run_project(args.run_project, args)
+    else:
+        # The subprocesses get the resolved settings.
+        passthrough = [
+            "--repeat", str(args.repeat), "--latency", str(args.latency), "--calls", str(args.calls),
+            "--concurrency", str(args.concurrency), "--channels", str(args.channels), "--bucket-limit", str(args.bucket_limit),
+            "--global-rate", str(args.global_rate),
+            "--texts", *map(str, args.texts), "--pages", *map(str, args.pages),
+        ] + (["--quick"] if args.quick else [])
+        sys.exit(run_suite(args, passthrough))
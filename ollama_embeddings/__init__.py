@@ -0,0 +1,6 @@
+"""Ollama embedding client, content-hash embedding cache and a local Ollama
+stub for benchmarks, shared by the plagiarism detector and chunking backends.
+
+The backends import them through their own ``embedding`` and
+``embedding_cache`` modules, which put the repository root on ``sys.path``.
+"""
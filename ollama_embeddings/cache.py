@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not coordinated across processes.
+    fcntl = None
+
+DIGEST_SIZE = 32  # SHA-256
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class VectorStore:
+    """Append-only, memory-mapped float32 vector file for one embedding model.
+
+    ``vectors.f32`` holds one row per entry and ``index.bin`` the SHA-256 of
+    each row's text, in the same order, so row ``i`` belongs to digest ``i``.
+    Vectors are written before their digest, so a crash mid-append never
+    exposes a partial row. Other processes can read the same files and pick
+    up new rows with ``refresh()``; appends take an exclusive file lock.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.index_path = os.path.join(directory, "index.bin")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.dim = dim
+        self.rows: Dict[bytes, int] = {}
+        self._records = 0
+        self._mapped: Optional[np.memmap] = None
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.rows) * (self.dim or 0) * 4
+
+    def refresh(self) -> None:
+        """Load digests appended since the last refresh (possibly by another process)."""
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        if self.dim is None or not os.path.exists(self.index_path) or not os.path.exists(self.vectors_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._records * DIGEST_SIZE)
+            tail = f.read()
+        complete_rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+        for offset in range(0, len(tail) - DIGEST_SIZE + 1, DIGEST_SIZE):
+            if self._records >= complete_rows:
+                break
+            self.rows.setdefault(tail[offset:offset + DIGEST_SIZE], self._records)
+            self._records += 1
+
+    def _vectors(self) -> np.ndarray:
+        if self._mapped is None or len(self._mapped) < self._records:
+            self._mapped = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._records, self.dim))
+        return self._mapped
+
+    def get(self, digest: bytes) -> Optional[np.ndarray]:
+        row = self.rows.get(digest)
+        if row is None:
+            return None
+        return np.array(self._vectors()[row])
+
+    def append(self, digests: List[bytes], vectors: np.ndarray) -> None:
+        if self.readonly or not digests:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.dim = vectors.shape[1]
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+        with open(self.index_path, "ab") as index_file:
+            if fcntl is not None:
+                fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                new = [i for i, digest in enumerate(digests) if digest not in self.rows]
+                if not new:
+                    return
+                # Rows follow the index file, which may have a torn tail from a crashed writer.
+                first_row = os.path.getsize(self.index_path) // DIGEST_SIZE
+                with open(self.vectors_path, "ab") as vectors_file:
+                    vectors_file.truncate(first_row * self.dim * 4)
+                    vectors_file.write(vectors[new].tobytes())
+                    vectors_file.flush()
+                    os.fsync(vectors_file.fileno())
+                index_file.truncate(first_row * DIGEST_SIZE)
+                index_file.write(b"".join(digests[i] for i in new))
+                index_file.flush()
+                for row, i in enumerate(new, start=first_row):
+                    self.rows[digests[i]] = row
+                self._records = first_row + len(new)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(index_file, fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache keyed by (model, SHA-256 of the text).
+
+    Lookups go to an in-memory LRU tier first, bounded by
+    ``memory_budget_bytes`` of vector data, then to a persistent
+    ``VectorStore`` per model under ``directory`` (``None`` keeps the cache
+    in memory only).
+    """
+
+    def __init__(self, directory: Optional[str] = "embedding_cache", memory_budget_bytes: int = 256 * 2**20, readonly: bool = False):
+        self.directory = directory
+        self.memory_budget_bytes = memory_budget_bytes
+        self.readonly = readonly
+        self._memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stores: Dict[str, VectorStore] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, model: str) -> Optional[VectorStore]:
+        if self.directory is None:
+            return None
+        store = self._stores.get(model)
+        if store is None:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+            store = self._stores[model] = VectorStore(os.path.join(self.directory, safe_name), readonly=self.readonly)
+        return store
+
+    def _remember(self, key: tuple, vector: np.ndarray) -> None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while self._memory_bytes > self.memory_budget_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get(self, model: str, digest: bytes) -> Optional[np.ndarray]:
+        key = (model, digest)
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+        store = self._store(model)
+        if store is not None:
+            vector = store.get(digest)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+        self.misses += 1
+        return None
+
+    def put_many(self, model: str, digests: List[bytes], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for digest, vector in zip(digests, vectors):
+            self._remember((model, digest), vector.copy())
+        store = self._store(model)
+        if store is not None:
+            store.append(digests, vectors)
+
+    async def embed(self, client, texts: List[str]) -> np.ndarray:
+        """Return a float32 array with one embedding per text, embedding only
+        texts that are not cached yet (each distinct text once)."""
+        digests = [text_digest(text) for text in texts]
+        store = self._store(client.model)
+        if store is not None:
+            # Pick up vectors other worker processes have added since the last call.
+            store.refresh()
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest in found or digest in missing:
+                continue
+            vector = self.get(client.model, digest)
+            if vector is None:
+                missing[digest] = text
+            else:
+                found[digest] = vector
+        if missing:
+            vectors = np.asarray(await client.embed(list(missing.values())), dtype=np.float32)
+            self.put_many(client.model, list(missing), vectors)
+            found.update(zip(missing, vectors))
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[digest] for digest in digests])
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "evictions": self.evictions,
+            "disk_entries": sum(len(store) for store in self._stores.values()),
+            "disk_bytes": sum(store.nbytes for store in self._stores.values()),
+        }
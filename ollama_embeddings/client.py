@@ -0,0 +1,106 @@
+import asyncio
+import os
+import random
+from typing import List, Optional
+
+import httpx
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text")
+
+# Statuses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class EmbeddingClient:
+    """Async client for Ollama embeddings with a pooled, app-lifetime connection.
+
+    Texts are sent in batches to Ollama's ``/api/embed`` endpoint, with at
+    most ``max_concurrency`` requests in flight, so embedding N texts takes
+    about N / (batch_size * max_concurrency) round-trips. Servers without
+    ``/api/embed`` fall back to one ``/api/embeddings`` request per text
+    (still concurrent). Failed requests are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        model: str = EMBED_MODEL,
+        max_concurrency: int = 8,
+        batch_size: int = 32,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        use_batch_api: bool = True,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.use_batch_api = use_batch_api
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self) -> "EmbeddingClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        if self._client is None or self._client.is_closed:
+            await self.start()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(path, json=payload)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        raise RuntimeError("unreachable")
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if self.use_batch_api:
+            try:
+                data = await self._post("/api/embed", {"model": self.model, "input": texts})
+                return data["embeddings"]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    raise
+                # Older Ollama versions only have the single-prompt endpoint.
+                self.use_batch_api = False
+        return await asyncio.gather(*(self._embed_one(text) for text in texts))
+
+    async def _embed_one(self, text: str) -> List[float]:
+        data = await self._post("/api/embeddings", {"model": self.model, "prompt": text})
+        return data["embedding"]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Return one embedding per text, in order."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*(self._embed_batch(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
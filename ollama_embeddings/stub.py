@@ -0,0 +1,116 @@
+"""Local stand-in for Ollama's embedding API, used by the benchmarks.
+
+Serves ``/api/embeddings`` (one prompt) and ``/api/embed`` (batch input) with
+deterministic vectors derived from a hash of each text, after a configurable
+delay per request plus a delay per embedded text. With ``--mode words`` a
+text's vector is the sum of per-word hashed vectors instead, so texts sharing
+words are similar and retrieval quality can be measured.
+
+    python -m ollama_embeddings.stub --port 11435 --latency 0.02
+
+from the repository root, or ``python benchmarks/stub_ollama.py`` from either
+backend. Point the backend at it with ``OLLAMA_URL=http://127.0.0.1:11435``.
+"""
+import argparse
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import List, Union
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+
+class EmbeddingsRequest(BaseModel):
+    model: str
+    prompt: str
+
+
+class EmbedRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+
+
+WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=100_000)
+def hashed_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim, dtype=np.float32)
+
+
+def fake_embedding(text: str, dim: int, mode: str = "hash") -> List[float]:
+    if mode == "words":
+        words = WORD.findall(text.lower())
+        return sum((hashed_vector(word, dim) for word in words), np.zeros(dim, dtype=np.float32)).tolist()
+    return hashed_vector(text, dim).tolist()
+
+
+def build_app(dim: int = 768, latency: float = 0.0, item_latency: float = 0.0, mode: str = "hash") -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    async def delay(items: int) -> None:
+        app.state.requests += 1
+        if latency or item_latency:
+            await asyncio.sleep(latency + item_latency * items)
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: EmbeddingsRequest):
+        await delay(1)
+        return {"embedding": fake_embedding(request.prompt, dim, mode)}
+
+    @app.post("/api/embed")
+    async def embed(request: EmbedRequest):
+        texts = [request.input] if isinstance(request.input, str) else request.input
+        await delay(len(texts))
+        return {"model": request.model, "embeddings": [fake_embedding(text, dim, mode) for text in texts]}
+
+    return app
+
+
+class StubServer:
+    """Runs the stub with uvicorn in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11435, **kwargs):
+        self.app = build_app(**kwargs)
+        self.url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+    @property
+    def requests(self) -> int:
+        return self.app.state.requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--item-latency", type=float, default=0.0, help="Seconds added per embedded text.")
+    parser.add_argument("--mode", choices=("hash", "words"), default="hash")
+    args = parser.parse_args()
+    app = build_app(dim=args.dim, latency=args.latency, item_latency=args.item_latency, mode=args.mode)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
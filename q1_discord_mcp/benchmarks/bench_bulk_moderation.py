@@ -0,0 +1,70 @@
+"""Compare one-at-a-time moderation with bulk_moderate against the local stub.
+
+``sequential`` deletes messages and kicks users one request at a time, as
+moderate_content does; ``bulk`` uses moderation.bulk_moderate, which batches
+deletions through bulk-delete and runs kicks concurrently.
+
+Usage (from ``q1_discord_mcp/``):
+
+    python benchmarks/bench_bulk_moderation.py --messages 500 --users 100 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord_client import DiscordClient  # noqa: E402
+from moderation import bulk_moderate  # noqa: E402
+from search_index import snowflake_from_datetime  # noqa: E402
+from stub_discord import start_stub  # noqa: E402
+
+
+async def main(messages: int, users: int, channels: int, latency: float, concurrency: int) -> None:
+    first_id = snowflake_from_datetime(datetime.now(timezone.utc))
+    message_targets = [f"{i % channels + 1}:{first_id + i}" for i in range(messages)]
+    user_targets = [f"1:{1000 + i}" for i in range(users)]
+
+    runner, base_url = await start_stub(latency=latency)
+    stats = runner.app["stats"]
+    try:
+        async with DiscordClient("stub-token", base_url=base_url) as client:
+            for name, action, targets in (("delete", "delete_message", message_targets), ("kick", "kick_user", user_targets)):
+                requests_before = stats["requests"]
+                started = time.perf_counter()
+                for target in targets:
+                    first, second = target.split(":")
+                    if action == "delete_message":
+                        await client.delete_message(first, second)
+                    else:
+                        await client.kick_user(first, second)
+                sequential = time.perf_counter() - started
+                sequential_requests = stats["requests"] - requests_before
+
+                requests_before = stats["requests"]
+                started = time.perf_counter()
+                results = await bulk_moderate(client, action, targets, max_concurrency=concurrency)
+                bulk = time.perf_counter() - started
+                bulk_requests = stats["requests"] - requests_before
+                failed = sum(not result.success for result in results)
+
+                print(
+                    f"{name:<7} targets={len(targets):5d}  sequential={sequential:7.2f}s ({sequential_requests} requests)  "
+                    f"bulk={bulk:6.2f}s ({bulk_requests} requests, {failed} failed)  speedup={sequential / bulk:6.1f}x"
+                )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.users, args.channels, args.latency, args.concurrency))
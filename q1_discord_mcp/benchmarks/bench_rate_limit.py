@@ -0,0 +1,72 @@
+"""Drive DiscordClient against the rate-limited stub and report 429s and throughput.
+
+The stub allows ``--bucket-limit`` requests per ``--bucket-window`` seconds on
+every route bucket. A well-behaved scheduler should reach close to
+``bucket_limit / bucket_window`` requests per second per bucket with few or no
+429 responses.
+
+First checks that a 429 without rate-limit headers (as a proxy might send)
+blocks its route only until ``Retry-After`` has passed.
+
+Usage (from ``q1_discord_mcp/``):
+
+    python benchmarks/bench_rate_limit.py --calls 200 --channels 4 --bucket-limit 5 --bucket-window 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord_client import DiscordClient  # noqa: E402
+from ratelimit import RateLimiter  # noqa: E402
+from stub_discord import start_stub  # noqa: E402
+
+
+async def check_headerless_429(retry_after: float = 0.2) -> None:
+    limiter = RateLimiter()
+    route, major = limiter.route_for("GET", "/channels/1")
+    async with limiter.slot(route, major):
+        limiter.update(route, major, 429, {"Retry-After": str(retry_after)})
+    started = time.perf_counter()
+    for _ in range(3):
+        async with limiter.slot(route, major):
+            limiter.update(route, major, 200, {})
+    waited = time.perf_counter() - started
+    assert waited >= retry_after * 0.9, f"headerless 429 was ignored ({waited:.2f}s)"
+    print(f"headerless 429: route blocked {waited:.2f}s (Retry-After {retry_after}s)")
+
+
+async def main(calls: int, channels: int, bucket_limit: int, bucket_window: float) -> None:
+    # A route that never reopens fails the check instead of hanging.
+    await asyncio.wait_for(check_headerless_429(), timeout=2)
+    runner, base_url = await start_stub(bucket_limit=bucket_limit, bucket_window=bucket_window)
+    stats = runner.app["stats"]
+    try:
+        async with DiscordClient("stub-token", base_url=base_url) as client:
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(client.send_message(str(i % channels), f"message {i}") for i in range(calls)),
+                return_exceptions=True,
+            )
+            wall = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    failures = sum(isinstance(result, Exception) for result in results)
+    ceiling = channels * bucket_limit / bucket_window
+    print(f"calls={calls} failures={failures} wall={wall:.2f}s")
+    print(f"throughput={calls / wall:.1f}/s (ceiling {ceiling:.1f}/s)")
+    print(f"upstream requests={stats['requests']} 429s={stats['rate_limited']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--bucket-limit", type=int, default=5)
+    parser.add_argument("--bucket-window", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.channels, args.bucket_limit, args.bucket_window))
@@ -0,0 +1,75 @@
+"""Compare per-call sessions with the pooled, long-lived DiscordClient session.
+
+Starts the local Discord stub, then issues the same calls two ways:
+
+* ``per_call`` - a fresh client (and therefore a fresh TCP connection) per call,
+  which is how every tool behaved before the shared client.
+* ``pooled``   - one client whose session is reused for every call.
+
+Usage (from ``q1_discord_mcp/``):
+
+    python benchmarks/bench_session_pool.py --calls 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord_client import DiscordClient  # noqa: E402
+from stub_discord import start_stub  # noqa: E402
+
+
+async def _run(calls: int, concurrency: int, call_factory) -> List[float]:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call_factory(i)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies
+
+
+def _report(name: str, latencies: List[float], wall: float) -> None:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered) * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    print(f"{name:<10} calls/s={len(ordered) / wall:9.1f}  p50={p50:7.2f}ms  p99={p99:7.2f}ms")
+
+
+async def main(calls: int, concurrency: int) -> None:
+    runner, base_url = await start_stub()
+    try:
+        async def per_call(i: int) -> None:
+            async with DiscordClient("stub-token", base_url=base_url) as client:
+                await client.get_channel(str(i))
+
+        started = time.perf_counter()
+        latencies = await _run(calls, concurrency, per_call)
+        _report("per_call", latencies, time.perf_counter() - started)
+
+        async with DiscordClient("stub-token", base_url=base_url) as client:
+            async def pooled(i: int) -> None:
+                await client.get_channel(str(i))
+
+            started = time.perf_counter()
+            latencies = await _run(calls, concurrency, pooled)
+            _report("pooled", latencies, time.perf_counter() - started)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
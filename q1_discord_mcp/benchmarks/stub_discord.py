@@ -0,0 +1,164 @@
+"""Minimal local stand-in for the Discord REST API, used by the benchmarks.
+
+Run it directly to serve on a port, or call ``start_stub()`` from a script:
+
+    python benchmarks/stub_discord.py --port 8765
+
+Point the server at it with ``DISCORD_API_BASE_URL=http://127.0.0.1:8765/api/v10``.
+
+With ``--bucket-limit`` set, every route bucket allows that many requests per
+``--bucket-window`` seconds and responds with Discord's ``X-RateLimit-*``
+headers, answering 429 with ``Retry-After`` once a bucket is exhausted.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from aiohttp import web
+
+API_PREFIX = "/api/v10"
+
+# Route parameters Discord keys rate-limit buckets on.
+_MAJOR_PARAMS = ("channel_id", "guild_id")
+
+_ids = itertools.count(10**17)
+
+
+def _snowflake() -> str:
+    return str(next(_ids))
+
+
+def _message(channel_id: str, content: str, message_id: Optional[str] = None) -> dict:
+    return {
+        "id": message_id or _snowflake(),
+        "channel_id": channel_id,
+        "author": {"id": "42", "username": "stub"},
+        "content": content,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class _StubBucket:
+    def __init__(self) -> None:
+        self.window_start = 0.0
+        self.used = 0
+
+
+def _bucket_key(request: web.Request) -> Tuple[str, str]:
+    """``(route, major_parameter)`` from the stub's own route table, independent
+    of how the client under test names its buckets."""
+    resource = request.match_info.route.resource
+    template = resource.canonical if resource is not None else request.path
+    major = next((request.match_info[name] for name in _MAJOR_PARAMS if name in request.match_info), "")
+    return f"{request.method} {template}", major
+
+
+def build_app(latency: float = 0.0, bucket_limit: int = 0, bucket_window: float = 1.0) -> web.Application:
+    """Build the stub application.
+
+    ``latency`` adds a fixed delay (seconds) per request. ``bucket_limit``
+    enables per-route rate limiting of that many requests per ``bucket_window``.
+    """
+    buckets: dict = {}
+    stats = {"requests": 0, "rate_limited": 0}
+
+    @web.middleware
+    async def rate_limit(request: web.Request, handler):
+        stats["requests"] += 1
+        if not bucket_limit:
+            return await handler(request)
+        route, major = _bucket_key(request)
+        bucket = buckets.setdefault((route, major), _StubBucket())
+        now = time.monotonic()
+        if now - bucket.window_start >= bucket_window:
+            bucket.window_start, bucket.used = now, 0
+        reset_after = bucket.window_start + bucket_window - now
+        headers = {
+            "X-RateLimit-Bucket": f"bucket-{abs(hash(route)) % 10**8}",
+            "X-RateLimit-Limit": str(bucket_limit),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        }
+        if bucket.used >= bucket_limit:
+            stats["rate_limited"] += 1
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["Retry-After"] = f"{reset_after:.3f}"
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": reset_after, "global": False},
+                status=429,
+                headers=headers,
+            )
+        bucket.used += 1
+        headers["X-RateLimit-Remaining"] = str(bucket_limit - bucket.used)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    async def _delay() -> None:
+        if latency:
+            await asyncio.sleep(latency)
+
+    async def send_message(request: web.Request) -> web.Response:
+        await _delay()
+        body = await request.json()
+        return web.json_response(_message(request.match_info["channel_id"], body.get("content", "")))
+
+    async def get_messages(request: web.Request) -> web.Response:
+        await _delay()
+        channel_id = request.match_info["channel_id"]
+        limit = min(int(request.query.get("limit", 50)), 100)
+        return web.json_response([_message(channel_id, f"message {i}") for i in range(limit)])
+
+    async def get_channel(request: web.Request) -> web.Response:
+        await _delay()
+        channel_id = request.match_info["channel_id"]
+        return web.json_response({"id": channel_id, "name": f"channel-{channel_id}", "type": 0, "guild_id": "1"})
+
+    async def bulk_delete(request: web.Request) -> web.Response:
+        await _delay()
+        body = await request.json()
+        if not 2 <= len(body.get("messages", [])) <= 100:
+            return web.json_response({"message": "Invalid Form Body", "code": 50035}, status=400)
+        return web.Response(status=204)
+
+    async def no_content(request: web.Request) -> web.Response:
+        await _delay()
+        return web.Response(status=204)
+
+    app = web.Application(middlewares=[rate_limit])
+    app["stats"] = stats
+    app.router.add_post(API_PREFIX + "/channels/{channel_id}/messages", send_message)
+    app.router.add_get(API_PREFIX + "/channels/{channel_id}/messages", get_messages)
+    app.router.add_get(API_PREFIX + "/channels/{channel_id}", get_channel)
+    app.router.add_post(API_PREFIX + "/channels/{channel_id}/messages/bulk-delete", bulk_delete)
+    app.router.add_delete(API_PREFIX + "/channels/{channel_id}/messages/{message_id}", no_content)
+    app.router.add_delete(API_PREFIX + "/guilds/{guild_id}/members/{user_id}", no_content)
+    app.router.add_put(API_PREFIX + "/guilds/{guild_id}/bans/{user_id}", no_content)
+    return app
+
+
+async def start_stub(host: str = "127.0.0.1", port: int = 0, **kwargs) -> Tuple[web.AppRunner, str]:
+    """Start the stub in the running event loop and return ``(runner, base_url)``.
+
+    Request and 429 counters are available as ``runner.app["stats"]``.
+    """
+    runner = web.AppRunner(build_app(**kwargs))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}{API_PREFIX}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bucket-limit", type=int, default=0)
+    parser.add_argument("--bucket-window", type=float, default=1.0)
+    args = parser.parse_args()
+    app = build_app(latency=args.latency, bucket_limit=args.bucket_limit, bucket_window=args.bucket_window)
+    web.run_app(app, host=args.host, port=args.port)
@@ -1,81 +1,253 @@
+import asyncio
+import time
 import aiohttp
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Callable
+
+from models import Message
+from ratelimit import RateLimiter, RateLimitedError
+
+
+class DiscordAPIError(Exception):
+    """A Discord API call returned an unexpected status."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
 
 class DiscordClient:
-    """Discord API client for interacting with Discord's REST API."""
-    
+    """Discord API client for interacting with Discord's REST API.
+
+    A single client owns one pooled ``aiohttp.ClientSession`` so that
+    connections are kept alive and reused across calls. Call ``start()``
+    (or use the client as an async context manager) when the server starts
+    and ``close()`` at shutdown; the session is also created lazily on
+    first use.
+
+    Every request goes through a ``RateLimiter`` that queues requests per
+    Discord rate-limit bucket and waits out reset windows before sending.
+    """
+
     BASE_URL = "https://discord.com/api/v10"
-    
-    def __init__(self, token: str):
+
+    def __init__(
+        self,
+        token: str,
+        base_url: Optional[str] = None,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 50,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300,
+        total_timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        max_concurrency: int = 50,
+        max_retries: int = 3,
+        rate_limiter: Optional[RateLimiter] = None,
+        on_request: Optional[Callable[[str, int, float, int], None]] = None,
+    ):
         self.token = token
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
         self.headers = {
             "Authorization": f"Bot {token}",
             "Content-Type": "application/json"
         }
-    
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrency=max_concurrency)
+        # Called as on_request(route, status, seconds, attempt) after every HTTP
+        # attempt, with status 0 when it raised before a response arrived.
+        self.on_request = on_request
+
+    async def start(self) -> None:
+        """Open the pooled HTTP session if it is not already open."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session and release its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "DiscordClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, opening it on first use."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Any]:
+        """Send a request through the rate limiter and return ``(status, body)``.
+
+        The body is decoded JSON when the response is JSON, otherwise text.
+        429 responses are retried after the advertised reset window, up to
+        ``max_retries`` times.
+        """
+        session = await self._get_session()
+        url = f"{self.base_url}{path}"
+        route, major = self.rate_limiter.route_for(method, path)
+
+        for attempt in range(self.max_retries + 1):
+            async with self.rate_limiter.slot(route, major):
+                started = time.perf_counter()
+                status = 0  # No response: the connection failed or timed out.
+                try:
+                    async with session.request(method, url, json=json, params=params, headers=headers) as response:
+                        status = response.status
+                        if response.content_type == "application/json":
+                            body = await response.json()
+                        else:
+                            body = await response.text()
+                        retry_after = self.rate_limiter.update(route, major, status, response.headers, body)
+                finally:
+                    if self.on_request is not None:
+                        self.on_request(route, status, time.perf_counter() - started, attempt)
+            if status != 429:
+                return status, body
+        raise RateLimitedError(route, retry_after)
+
     async def send_message(self, channel_id: str, content: str) -> Dict[str, Any]:
         """Send a message to a Discord channel."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/channels/{channel_id}/messages"
-            payload = {"content": content}
-            
-            async with session.post(url, headers=self.headers, json=payload) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Failed to send message: {response.status} - {error_text}")
-    
-    async def get_channel_messages(self, channel_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get messages from a Discord channel."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/channels/{channel_id}/messages?limit={limit}"
-            
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Failed to get messages: {response.status} - {error_text}")
-    
+        status, body = await self._request(
+            "POST", f"/channels/{channel_id}/messages", json={"content": content}
+        )
+        if status == 200:
+            return body
+        raise DiscordAPIError(f"Failed to send message: {status} - {body}", status)
+
+    async def get_channel_messages(
+        self,
+        channel_id: str,
+        limit: int = 10,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get up to 100 messages from a Discord channel, newest first.
+
+        ``before`` / ``after`` are message-ID cursors, as in Discord's API.
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if before:
+            params["before"] = before
+        if after:
+            params["after"] = after
+        status, body = await self._request("GET", f"/channels/{channel_id}/messages", params=params)
+        if status == 200:
+            return body
+        raise DiscordAPIError(f"Failed to get messages: {status} - {body}", status)
+
+    async def iter_channel_messages(
+        self,
+        channel_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[Message]:
+        """Walk a channel's history page by page, yielding ``Message`` models.
+
+        By default messages are yielded newest to oldest, starting below
+        ``before`` (or the latest message) and stopping at ``after`` if given.
+        When only ``after`` is given, messages are yielded oldest to newest.
+        The next page is requested while the current one is being consumed.
+        ``limit=None`` walks the whole history.
+        """
+        forward = after is not None and before is None
+        lower_bound = int(after) if after is not None and not forward else None
+        remaining = limit
+
+        def fetch(cursor: Optional[str], size: int) -> "asyncio.Task[List[Dict[str, Any]]]":
+            cursor_args = {"after": cursor} if forward else {"before": cursor}
+            return asyncio.ensure_future(self.get_channel_messages(channel_id, size, **cursor_args))
+
+        size = page_size if remaining is None else min(page_size, remaining)
+        pending: Optional[asyncio.Task] = fetch(after if forward else before, size) if size > 0 else None
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if not page:
+                    return
+                if forward:
+                    page.reverse()
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+
+                last_id = page[-1]["id"]
+                exhausted = len(page) < size or (lower_bound is not None and int(last_id) <= lower_bound)
+                if not exhausted and (remaining is None or remaining > 0):
+                    size = page_size if remaining is None else min(page_size, remaining)
+                    pending = fetch(last_id, size)
+
+                for data in page:
+                    if lower_bound is not None and int(data["id"]) <= lower_bound:
+                        return
+                    yield Message.from_api(data, channel_id)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
     async def get_channel(self, channel_id: str) -> Dict[str, Any]:
         """Get information about a Discord channel."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/channels/{channel_id}"
-            
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Failed to get channel: {response.status} - {error_text}")
-    
-    async def delete_message(self, channel_id: str, message_id: str) -> bool:
+        status, body = await self._request("GET", f"/channels/{channel_id}")
+        if status == 200:
+            return body
+        raise DiscordAPIError(f"Failed to get channel: {status} - {body}", status)
+
+    async def delete_message(self, channel_id: str, message_id: str) -> None:
         """Delete a message from a Discord channel."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/channels/{channel_id}/messages/{message_id}"
-            
-            async with session.delete(url, headers=self.headers) as response:
-                return response.status == 204
-    
-    async def kick_user(self, guild_id: str, user_id: str, reason: Optional[str] = None) -> bool:
+        status, body = await self._request("DELETE", f"/channels/{channel_id}/messages/{message_id}")
+        if status != 204:
+            raise DiscordAPIError(f"Failed to delete message: {status} - {body}", status)
+
+    async def bulk_delete_messages(self, channel_id: str, message_ids: List[str]) -> None:
+        """Delete 2-100 messages (none older than 14 days) from a channel in one request."""
+        status, body = await self._request(
+            "POST", f"/channels/{channel_id}/messages/bulk-delete", json={"messages": message_ids}
+        )
+        if status != 204:
+            raise DiscordAPIError(f"Failed to bulk delete messages: {status} - {body}", status)
+
+    async def kick_user(self, guild_id: str, user_id: str, reason: Optional[str] = None) -> None:
         """Kick a user from a Discord guild."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/guilds/{guild_id}/members/{user_id}"
-            headers = self.headers.copy()
-            if reason:
-                headers["X-Audit-Log-Reason"] = reason
-            
-            async with session.delete(url, headers=headers) as response:
-                return response.status == 204
-    
-    async def ban_user(self, guild_id: str, user_id: str, reason: Optional[str] = None) -> bool:
+        headers = {"X-Audit-Log-Reason": reason} if reason else None
+        status, body = await self._request("DELETE", f"/guilds/{guild_id}/members/{user_id}", headers=headers)
+        if status != 204:
+            raise DiscordAPIError(f"Failed to kick user: {status} - {body}", status)
+
+    async def ban_user(self, guild_id: str, user_id: str, reason: Optional[str] = None) -> None:
         """Ban a user from a Discord guild."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.BASE_URL}/guilds/{guild_id}/bans/{user_id}"
-            headers = self.headers.copy()
-            if reason:
-                headers["X-Audit-Log-Reason"] = reason
-            
-            async with session.put(url, headers=headers) as response:
-                return response.status == 204
+        headers = {"X-Audit-Log-Reason": reason} if reason else None
+        status, body = await self._request("PUT", f"/guilds/{guild_id}/bans/{user_id}", headers=headers)
+        if status != 204:
+            raise DiscordAPIError(f"Failed to ban user: {status} - {body}", status)
@@ -1,22 +1,117 @@
 # server.py
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator
 from dotenv import load_dotenv
 from fastmcp import FastMCP, Context
 from pydantic import Field
-from models import SendMessageInput, Message, ChannelInfo, SearchMessagesInput, ModerateContentInput
-from discord_client import DiscordClient
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from models import SendMessageInput, Message, MessagePage, ChannelInfo, SearchMessagesInput, ModerateContentInput, BulkModerateInput
+from cache import TTLCache
+from discord_client import DiscordAPIError, DiscordClient
+from metrics import Metrics, MetricsMiddleware
+from moderation import ACTIONS, bulk_moderate
+from search_index import MessageIndex
 
 load_dotenv()
 
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 MCP_API_KEY = os.getenv("MCP_API_KEY")
+DISCORD_API_BASE_URL = os.getenv("DISCORD_API_BASE_URL")  # Override to point at a local stub
+CHANNEL_CACHE_SIZE = int(os.getenv("CHANNEL_CACHE_SIZE", "1024"))
+CHANNEL_CACHE_TTL = float(os.getenv("CHANNEL_CACHE_TTL", "300"))  # Seconds
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "discord_index.db")
+SEARCH_SYNC_INTERVAL = float(os.getenv("SEARCH_SYNC_INTERVAL", "60"))  # Seconds between incremental syncs per channel
+SEARCH_BACKFILL_LIMIT = int(os.getenv("SEARCH_BACKFILL_LIMIT", "10000"))  # 0 backfills the whole history
 
 if not DISCORD_BOT_TOKEN:
     print("WARNING: DISCORD_BOT_TOKEN not set. Discord tools will not function correctly.")
 
 
-mcp = FastMCP(name="DiscordMCP")
+# --- Instrumentation ---
+# Tool latency (via middleware) and upstream Discord calls (via the client's
+# on_request hook) are recorded here and exposed at /metrics and via the
+# `metrics` tool.
+metrics = Metrics()
+
+
+# --- Shared Discord client ---
+# One client (and one pooled HTTP session) per server process, so tool calls
+# reuse kept-alive connections instead of paying a new handshake every time.
+_discord_client: Optional[DiscordClient] = None
+
+
+def get_discord_client() -> DiscordClient:
+    """Return the process-wide Discord client, creating it on first use."""
+    global _discord_client
+    if _discord_client is None:
+        _discord_client = DiscordClient(
+            DISCORD_BOT_TOKEN, base_url=DISCORD_API_BASE_URL, on_request=metrics.observe_upstream
+        )
+    return _discord_client
+
+
+# --- Metadata cache ---
+# Channel metadata rarely changes, so lookups are served from an in-process
+# TTL/LRU cache. Entries are invalidated when a call shows they are stale
+# (e.g. the channel is gone or the bot lost access to it).
+channel_cache = TTLCache(maxsize=CHANNEL_CACHE_SIZE, ttl=CHANNEL_CACHE_TTL)
+metrics.register_gauges("channel_cache", channel_cache)
+
+# Statuses that mean cached metadata for the target no longer holds.
+STALE_STATUSES = (403, 404)
+
+
+def invalidate_channel_on_error(channel_id: str, error: Exception) -> None:
+    """Drop cached channel metadata when an API error shows it is stale."""
+    if isinstance(error, DiscordAPIError) and error.status in STALE_STATUSES:
+        channel_cache.invalidate(channel_id)
+
+
+# --- Local search index ---
+# search_messages queries an on-disk SQLite FTS5 index instead of the API.
+_search_index: Optional[MessageIndex] = None
+
+
+def get_search_index() -> MessageIndex:
+    """Return the process-wide message index, opening it on first use."""
+    global _search_index
+    if _search_index is None:
+        _search_index = MessageIndex(SEARCH_INDEX_PATH)
+    return _search_index
+
+
+async def sync_search_index(channel_id: str, force: bool = False) -> int:
+    """Ingest new messages for a channel unless it was synced recently."""
+    index = get_search_index()
+    last_synced = index.last_synced(channel_id)
+    if not force and last_synced is not None and time.time() - last_synced < SEARCH_SYNC_INTERVAL:
+        return 0
+    return await index.sync_channel(
+        get_discord_client(), channel_id, backfill_limit=SEARCH_BACKFILL_LIMIT or None
+    )
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Open the shared Discord session at startup and close it at shutdown."""
+    global _discord_client, _search_index
+    client = get_discord_client()
+    await client.start()
+    try:
+        yield
+    finally:
+        await client.close()
+        _discord_client = None
+        if _search_index is not None:
+            _search_index.close()
+            _search_index = None
+
+
+mcp = FastMCP(name="DiscordMCP", lifespan=lifespan)
 
 
 @mcp.tool
@@ -34,11 +129,12 @@ async def send_message(
     await ctx.info(f"Attempting to send message to channel {input.channel_id}")
     
     try:
-        discord_client = DiscordClient(DISCORD_BOT_TOKEN)
+        discord_client = get_discord_client()
         response = await discord_client.send_message(input.channel_id, input.message_content)
         await ctx.info(f"Message sent successfully to channel {input.channel_id}")
         return {"status": "success", "message_id": response["id"]}
     except Exception as e:
+        invalidate_channel_on_error(input.channel_id, e)
         await ctx.error(f"Failed to send message: {e}")
         return {"status": "error", "message": str(e)}
 
@@ -46,10 +142,11 @@ async def send_message(
 async def get_messages(
     ctx: Context,
     channel_id: str = Field(..., description="The ID of the Discord channel."),
-    limit: int = Field(10, description="Maximum number of messages to retrieve.", ge=1, le=100),
+    limit: int = Field(10, description="Maximum number of messages to retrieve.", ge=1, le=1000),
 ) -> List[Message]:
     """
     Retrieves message history from a specified Discord channel.
+    For larger exports, page through history with get_messages_page instead.
     """
     if not DISCORD_BOT_TOKEN:
         await ctx.error("Discord bot token not configured. Cannot retrieve messages.")
@@ -58,25 +155,52 @@ async def get_messages(
     await ctx.info(f"Retrieving {limit} messages from channel {channel_id}")
     
     try:
-        discord_client = DiscordClient(DISCORD_BOT_TOKEN)
-        messages_data = await discord_client.get_channel_messages(channel_id, limit)
-        
+        discord_client = get_discord_client()
         result = []
-        for msg in messages_data:
-            result.append(Message(
-                id=msg["id"],
-                channel_id=channel_id,
-                author_id=msg["author"]["id"],
-                content=msg["content"],
-                timestamp=msg["timestamp"]
-            ))
+        async for message in discord_client.iter_channel_messages(channel_id, limit=limit):
+            result.append(message)
+            if len(result) % 100 == 0:
+                await ctx.report_progress(len(result), limit)
         
         await ctx.info(f"Successfully retrieved {len(result)} messages")
         return result
     except Exception as e:
+        invalidate_channel_on_error(channel_id, e)
         await ctx.error(f"Failed to retrieve messages: {e}")
         return []
 
+@mcp.tool
+async def get_messages_page(
+    ctx: Context,
+    channel_id: str = Field(..., description="The ID of the Discord channel."),
+    before: Optional[str] = Field(None, description="Return messages older than this message ID."),
+    after: Optional[str] = Field(None, description="Return messages newer than this message ID (oldest first)."),
+    page_size: int = Field(100, description="Number of messages in the page.", ge=1, le=100),
+) -> Optional[MessagePage]:
+    """
+    Retrieves one page of channel history and a cursor for the next page.
+    Pass next_cursor back as 'before' (or as 'after' when paging forward) to continue.
+    """
+    if not DISCORD_BOT_TOKEN:
+        await ctx.error("Discord bot token not configured. Cannot retrieve messages.")
+        return None
+
+    await ctx.info(f"Retrieving a page of {page_size} messages from channel {channel_id}")
+
+    try:
+        discord_client = get_discord_client()
+        messages = [
+            message async for message in discord_client.iter_channel_messages(
+                channel_id, limit=page_size, before=before, after=after, page_size=page_size
+            )
+        ]
+        next_cursor = messages[-1].id if len(messages) == page_size else None
+        return MessagePage(messages=messages, next_cursor=next_cursor)
+    except Exception as e:
+        invalidate_channel_on_error(channel_id, e)
+        await ctx.error(f"Failed to retrieve messages: {e}")
+        return None
+
 @mcp.tool
 async def get_channel_info(
     ctx: Context,
@@ -84,6 +208,7 @@ async def get_channel_info(
 ) -> Optional[ChannelInfo]:
     """
     Fetches metadata for a specified Discord channel.
+    Results are cached for CHANNEL_CACHE_TTL seconds.
     """
     if not DISCORD_BOT_TOKEN:
         await ctx.error("Discord bot token not configured. Cannot get channel info.")
@@ -92,15 +217,18 @@ async def get_channel_info(
     await ctx.info(f"Fetching info for channel {channel_id}")
     
     try:
-        discord_client = DiscordClient(DISCORD_BOT_TOKEN)
-        channel_data = await discord_client.get_channel(channel_id)
-        
-        return ChannelInfo(
-            id=channel_data["id"],
-            name=channel_data["name"],
-            type=channel_data["type"],
-            guild_id=channel_data.get("guild_id", "")
-        )
+        discord_client = get_discord_client()
+
+        async def load() -> ChannelInfo:
+            channel_data = await discord_client.get_channel(channel_id)
+            return ChannelInfo(
+                id=channel_data["id"],
+                name=channel_data["name"],
+                type=channel_data["type"],
+                guild_id=channel_data.get("guild_id", "")
+            )
+
+        return await channel_cache.get_or_load(channel_id, load)
     except Exception as e:
         await ctx.error(f"Failed to get channel info: {e}")
         return None
@@ -112,6 +240,9 @@ async def search_messages(
 ) -> List[Message]:
     """
     Searches Discord message history with filters.
+    Results come from the local search index, ranked by relevance. When channel_id
+    is given, that channel is synced incrementally first; otherwise every indexed
+    channel is searched.
     """
     if not DISCORD_BOT_TOKEN:
         await ctx.error("Discord bot token not configured. Cannot search messages.")
@@ -120,38 +251,48 @@ async def search_messages(
     await ctx.info(f"Searching for '{input.query}' in channel {input.channel_id or 'all'} (limit: {input.limit})")
     
     try:
-        discord_client = DiscordClient(DISCORD_BOT_TOKEN)
-        
-        # Discord API doesn't have a direct search endpoint for bots
-        # We'll fetch messages and filter them client-side
         if input.channel_id:
-            # If channel_id is provided, search only in that channel
-            messages_data = await discord_client.get_channel_messages(input.channel_id, 100)  # Get more messages to filter
-            
-            result = []
-            for msg in messages_data:
-                if input.query.lower() in msg["content"].lower():
-                    result.append(Message(
-                        id=msg["id"],
-                        channel_id=input.channel_id,
-                        author_id=msg["author"]["id"],
-                        content=msg["content"],
-                        timestamp=msg["timestamp"]
-                    ))
-                    if len(result) >= input.limit:
-                        break
-            
-            await ctx.info(f"Found {len(result)} messages matching query")
-            return result
-        else:
-            # If no channel_id, we can't search across all channels efficiently
-            # This would require knowledge of all accessible channels
-            await ctx.warning("Searching across all channels is not supported")
-            return []
+            added = await sync_search_index(input.channel_id)
+            if added:
+                await ctx.info(f"Indexed {added} new messages from channel {input.channel_id}")
+
+        result = await asyncio.to_thread(
+            get_search_index().search,
+            input.query,
+            channel_id=input.channel_id,
+            author_id=input.author_id,
+            since=input.since,
+            until=input.until,
+            limit=input.limit,
+        )
+        await ctx.info(f"Found {len(result)} messages matching query")
+        return result
     except Exception as e:
         await ctx.error(f"Failed to search messages: {e}")
         return []
 
+@mcp.tool
+async def index_channel(
+    ctx: Context,
+    channel_id: str = Field(..., description="The ID of the Discord channel to index."),
+) -> Dict[str, Any]:
+    """
+    Adds a channel to the local search index, or ingests its new messages.
+    """
+    if not DISCORD_BOT_TOKEN:
+        await ctx.error("Discord bot token not configured. Cannot index channel.")
+        return {"status": "error", "message": "Discord bot token missing."}
+
+    await ctx.info(f"Indexing channel {channel_id}")
+
+    try:
+        added = await sync_search_index(channel_id, force=True)
+        await ctx.info(f"Indexed {added} new messages from channel {channel_id}")
+        return {"status": "success", "indexed": added}
+    except Exception as e:
+        await ctx.error(f"Failed to index channel: {e}")
+        return {"status": "error", "message": str(e)}
+
 @mcp.tool
 async def moderate_content(
     input: ModerateContentInput,
@@ -167,7 +308,7 @@ async def moderate_content(
     await ctx.info(f"Attempting to perform moderation action '{input.action}' on '{input.target_id}' (Reason: {input.reason or 'N/A'})")
     
     try:
-        discord_client = DiscordClient(DISCORD_BOT_TOKEN)
+        discord_client = get_discord_client()
         
         if input.action == "delete_message":
             # For delete_message, target_id should be in format "channel_id:message_id"
@@ -176,14 +317,9 @@ async def moderate_content(
                 return {"status": "error", "message": "Invalid target_id format"}
             
             channel_id, message_id = input.target_id.split(":", 1)
-            success = await discord_client.delete_message(channel_id, message_id)
-            
-            if success:
-                await ctx.info(f"Successfully deleted message {message_id}")
-                return {"status": "success", "message": f"Message {message_id} deleted"}
-            else:
-                await ctx.error(f"Failed to delete message {message_id}")
-                return {"status": "error", "message": "Failed to delete message"}
+            await discord_client.delete_message(channel_id, message_id)
+            await ctx.info(f"Successfully deleted message {message_id}")
+            return {"status": "success", "message": f"Message {message_id} deleted"}
                 
         elif input.action == "kick_user":
             # For kick_user, target_id should be in format "guild_id:user_id"
@@ -192,14 +328,9 @@ async def moderate_content(
                 return {"status": "error", "message": "Invalid target_id format"}
             
             guild_id, user_id = input.target_id.split(":", 1)
-            success = await discord_client.kick_user(guild_id, user_id, input.reason)
-            
-            if success:
-                await ctx.info(f"Successfully kicked user {user_id}")
-                return {"status": "success", "message": f"User {user_id} kicked"}
-            else:
-                await ctx.error(f"Failed to kick user {user_id}")
-                return {"status": "error", "message": "Failed to kick user"}
+            await discord_client.kick_user(guild_id, user_id, input.reason)
+            await ctx.info(f"Successfully kicked user {user_id}")
+            return {"status": "success", "message": f"User {user_id} kicked"}
                 
         elif input.action == "ban_user":
             # For ban_user, target_id should be in format "guild_id:user_id"
@@ -208,22 +339,60 @@ async def moderate_content(
                 return {"status": "error", "message": "Invalid target_id format"}
             
             guild_id, user_id = input.target_id.split(":", 1)
-            success = await discord_client.ban_user(guild_id, user_id, input.reason)
-            
-            if success:
-                await ctx.info(f"Successfully banned user {user_id}")
-                return {"status": "success", "message": f"User {user_id} banned"}
-            else:
-                await ctx.error(f"Failed to ban user {user_id}")
-                return {"status": "error", "message": "Failed to ban user"}
+            await discord_client.ban_user(guild_id, user_id, input.reason)
+            await ctx.info(f"Successfully banned user {user_id}")
+            return {"status": "success", "message": f"User {user_id} banned"}
         else:
             await ctx.warning(f"Unknown moderation action: {input.action}")
             return {"status": "error", "message": "Unknown moderation action"}
     except Exception as e:
+        if input.action == "delete_message":
+            invalidate_channel_on_error(input.target_id.split(":", 1)[0], e)
         await ctx.error(f"Failed to perform moderation action: {e}")
         return {"status": "error", "message": str(e)}
 
 
+@mcp.tool
+async def bulk_moderate_content(
+    input: BulkModerateInput,
+    ctx: Context
+) -> Dict[str, Any]:
+    """
+    Applies one moderation action to many targets at once (e.g. raid cleanup).
+    Message deletions in the same channel are batched through Discord's bulk-delete
+    endpoint; kicks and bans run concurrently. Reports success or failure per target.
+    """
+    if not DISCORD_BOT_TOKEN:
+        await ctx.error("Discord bot token not configured. Cannot moderate content.")
+        return {"status": "error", "message": "Discord bot token missing."}
+
+    if input.action not in ACTIONS:
+        await ctx.warning(f"Unknown moderation action: {input.action}")
+        return {"status": "error", "message": "Unknown moderation action"}
+
+    await ctx.info(f"Attempting bulk moderation action '{input.action}' on {len(input.target_ids)} targets (Reason: {input.reason or 'N/A'})")
+
+    try:
+        results = await bulk_moderate(
+            get_discord_client(), input.action, input.target_ids, input.reason, input.max_concurrency
+        )
+        if input.action == "delete_message":
+            for result in results:
+                if result.status in STALE_STATUSES:
+                    channel_cache.invalidate(result.target_id.split(":", 1)[0])
+        failed = sum(not result.success for result in results)
+        await ctx.info(f"Bulk moderation finished: {len(results) - failed} succeeded, {failed} failed")
+        return {
+            "status": "success" if not failed else "partial" if failed < len(results) else "error",
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": [result.model_dump() for result in results],
+        }
+    except Exception as e:
+        await ctx.error(f"Failed to perform bulk moderation: {e}")
+        return {"status": "error", "message": str(e)}
+
+
 # --- Authentication Layer ---
 # FastMCP uses `AuthProviders` for server protection.
 # We'll use a simple in-memory API key provider for demonstration.
@@ -235,6 +404,24 @@ async def moderate_content(
 # Add the middleware to the FastMCP server
 # mcp.add_middleware(AuditLoggingMiddleware)
 
+# --- Metrics ---
+mcp.add_middleware(MetricsMiddleware(metrics))
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint (HTTP transports only)."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.tool(name="metrics")
+async def get_metrics(ctx: Context) -> Dict[str, Any]:
+    """
+    Returns server metrics: per-tool latency percentiles (p50/p95/p99), in-flight and
+    error counts, and Discord API latency, status codes, 429s and retries by route.
+    """
+    return metrics.snapshot()
+
 # --- Rate Limiting (Conceptual) ---
 # FastMCP has built-in rate limiting middleware.
 # You would configure it based on your needs (e.g., per IP, per API key).
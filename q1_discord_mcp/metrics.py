@@ -0,0 +1,191 @@
+import bisect
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Latency bucket upper bounds in seconds, covering cached lookups through slow upstream calls.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, as in Prometheus.
+
+    Memory stays constant regardless of the number of observations;
+    quantiles are estimated by linear interpolation within a bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Counters and histograms for MCP tools and upstream Discord calls."""
+
+    def __init__(self) -> None:
+        self.tool_latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.tool_calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.tool_in_flight: Dict[str, int] = defaultdict(int)
+        self.upstream_latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.upstream_responses: Dict[Tuple[str, Any], int] = defaultdict(int)
+        self.upstream_rate_limited: Dict[str, int] = defaultdict(int)
+        self.upstream_retries: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, Any] = {}
+
+    def observe_tool(self, tool: str, seconds: float, outcome: str) -> None:
+        self.tool_latency[tool].observe(seconds)
+        self.tool_calls[(tool, outcome)] += 1
+
+    def observe_upstream(self, route: str, status: int, seconds: float, attempt: int) -> None:
+        """Client hook: record one HTTP attempt against the Discord API.
+
+        ``status`` 0 (no response) is counted under the ``error`` status label.
+        """
+        self.upstream_latency[route].observe(seconds)
+        self.upstream_responses[(route, status or "error")] += 1
+        if status == 429:
+            self.upstream_rate_limited[route] += 1
+        if attempt:
+            self.upstream_retries[route] += 1
+
+    def register_gauges(self, name: str, source: Any) -> None:
+        """Expose ``source.stats()`` (numeric values only) as gauges under ``name``."""
+        self.gauges[name] = source
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as plain data, with p50/p95/p99 per histogram."""
+        return {
+            "tools": {
+                tool: {
+                    **histogram.summary(),
+                    "in_flight": self.tool_in_flight[tool],
+                    "errors": self.tool_calls[(tool, "error")],
+                }
+                for tool, histogram in self.tool_latency.items()
+            },
+            "upstream": {
+                route: {
+                    **histogram.summary(),
+                    "statuses": {
+                        str(status): count
+                        for (response_route, status), count in self.upstream_responses.items()
+                        if response_route == route
+                    },
+                    "rate_limited": self.upstream_rate_limited[route],
+                    "retries": self.upstream_retries[route],
+                }
+                for route, histogram in self.upstream_latency.items()
+            },
+            "gauges": {name: source.stats() for name, source in self.gauges.items()},
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        _render_histograms(lines, "mcp_tool_duration_seconds", "MCP tool call latency.", "tool", self.tool_latency)
+        _render_counter(lines, "mcp_tool_calls_total", "MCP tool calls by outcome.", ("tool", "outcome"), self.tool_calls)
+        lines.append("# HELP mcp_tool_in_flight MCP tool calls currently running.")
+        lines.append("# TYPE mcp_tool_in_flight gauge")
+        for tool, value in self.tool_in_flight.items():
+            lines.append(f'mcp_tool_in_flight{{tool="{tool}"}} {value}')
+        _render_histograms(
+            lines, "discord_request_duration_seconds", "Discord API request latency.", "route", self.upstream_latency
+        )
+        _render_counter(
+            lines, "discord_responses_total", "Discord API responses by status.", ("route", "status"), self.upstream_responses
+        )
+        _render_counter(
+            lines, "discord_rate_limited_total", "Discord API 429 responses.", ("route",), self.upstream_rate_limited
+        )
+        _render_counter(lines, "discord_retries_total", "Discord API request retries.", ("route",), self.upstream_retries)
+        for name, source in self.gauges.items():
+            for key, value in source.stats().items():
+                if isinstance(value, (int, float)):
+                    metric = f"{name}_{key}"
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware(Middleware):
+    """Records per-tool latency, outcome and in-flight counts."""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        self.metrics.tool_in_flight[tool] += 1
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = _outcome(result)
+            return result
+        finally:
+            self.metrics.tool_in_flight[tool] -= 1
+            self.metrics.observe_tool(tool, time.perf_counter() - started, outcome)
+
+
+def _outcome(result: Any) -> str:
+    """``error`` for tools that report failure as ``{"status": "error"}``."""
+    payload = getattr(result, "structured_content", result)
+    if isinstance(payload, dict) and payload.get("status") == "error":
+        return "error"
+    return "ok"
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+def _render_histograms(lines: List[str], name: str, help_text: str, label: str, histograms: Dict[str, Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in histograms.items():
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.sum}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+
+
+def _render_counter(lines: List[str], name: str, help_text: str, label_names: Sequence[str], counter: Dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in counter.items():
+        values = key if isinstance(key, tuple) else (key,)
+        lines.append(f"{name}{{{_labels(label_names, values)}}} {value}")
@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -15,6 +16,22 @@ class Message(BaseModel):
     content: str
     timestamp: str
 
+    @classmethod
+    def from_api(cls, data: Dict[str, Any], channel_id: str) -> "Message":
+        """Build a Message from a Discord API message object."""
+        return cls(
+            id=data["id"],
+            channel_id=channel_id,
+            author_id=data["author"]["id"],
+            content=data["content"],
+            timestamp=data["timestamp"]
+        )
+
+class MessagePage(BaseModel):
+    """One page of channel history plus the cursor for the next page."""
+    messages: List[Message]
+    next_cursor: Optional[str] = Field(None, description="Pass as 'before' (or 'after' when paging forward) to get the next page; null when there are no more messages.")
+
 class ChannelInfo(BaseModel):
     """Represents Discord channel metadata."""
     id: str
@@ -24,12 +41,29 @@ class ChannelInfo(BaseModel):
 
 class SearchMessagesInput(BaseModel):
     """Input for searching messages."""
-    channel_id: Optional[str] = Field(None, description="Optional channel ID to filter by.")
+    channel_id: Optional[str] = Field(None, description="Optional channel ID to filter by. Omit to search every indexed channel.")
     query: str = Field(..., description="The search query string.")
+    author_id: Optional[str] = Field(None, description="Optional author ID to filter by.")
+    since: Optional[datetime] = Field(None, description="Only return messages sent at or after this time.")
+    until: Optional[datetime] = Field(None, description="Only return messages sent before this time.")
     limit: int = Field(10, description="Maximum number of messages to return.", ge=1, le=100)
 
 class ModerateContentInput(BaseModel):
     """Input for content moderation actions."""
     action: str = Field(..., description="The moderation action (e.g., 'delete_message', 'kick_user', 'ban_user').")
     target_id: str = Field(..., description="The ID of the message or user to moderate.")
-    reason: Optional[str] = Field(None, description="The reason for the moderation action.")
\ No newline at end of file
+    reason: Optional[str] = Field(None, description="The reason for the moderation action.")
+
+class BulkModerateInput(BaseModel):
+    """Input for applying one moderation action to many targets."""
+    action: str = Field(..., description="The moderation action ('delete_message', 'kick_user', 'ban_user').")
+    target_ids: List[str] = Field(..., description="Targets as 'channel_id:message_id' (delete_message) or 'guild_id:user_id' (kick_user, ban_user).", min_length=1, max_length=1000)
+    reason: Optional[str] = Field(None, description="The reason for the moderation action.")
+    max_concurrency: int = Field(10, description="Maximum number of moderation requests in flight.", ge=1, le=50)
+
+class ModerationResult(BaseModel):
+    """Outcome of a moderation action on one target."""
+    target_id: str
+    success: bool
+    error: Optional[str] = None
+    status: Optional[int] = None  # Discord's HTTP status when the call failed
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Dict, List, Optional
+
+from discord_client import DiscordAPIError, DiscordClient
+from models import ModerationResult
+from search_index import snowflake_from_datetime
+
+BULK_DELETE_MAX = 100
+# Discord's bulk-delete endpoint rejects messages older than two weeks.
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+ACTIONS = ("delete_message", "kick_user", "ban_user")
+
+
+def _split_target(target_id: str) -> Optional[List[str]]:
+    parts = target_id.split(":", 1)
+    return parts if len(parts) == 2 and all(part.isdigit() for part in parts) else None
+
+
+async def bulk_moderate(
+    client: DiscordClient,
+    action: str,
+    target_ids: List[str],
+    reason: Optional[str] = None,
+    max_concurrency: int = 10,
+) -> List[ModerationResult]:
+    """Apply one moderation action to many targets and report the outcome per target.
+
+    Message deletions are grouped by channel and sent through the bulk-delete
+    endpoint in batches of up to 100; messages too old for it, and single
+    leftovers, are deleted one by one. Kicks and bans run concurrently, at
+    most ``max_concurrency`` at a time.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown moderation action: {action}")
+
+    results: Dict[str, ModerationResult] = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(targets: List[str], call: Awaitable[None]) -> None:
+        success, error, status = True, None, None
+        async with semaphore:
+            try:
+                await call
+            except DiscordAPIError as e:
+                success, error, status = False, str(e), e.status
+            except Exception as e:
+                success, error = False, str(e)
+        for target_id in targets:
+            results[target_id] = ModerationResult(target_id=target_id, success=success, error=error, status=status)
+
+    calls = []
+    by_channel: Dict[str, List[str]] = {}
+    # Each target is acted on once; a repeat would race the first for its result.
+    for target_id in dict.fromkeys(target_ids):
+        parts = _split_target(target_id)
+        if parts is None:
+            kind = "channel_id:message_id" if action == "delete_message" else "guild_id:user_id"
+            results[target_id] = ModerationResult(
+                target_id=target_id, success=False, error=f"Invalid target_id format. Expected '{kind}'"
+            )
+        elif action == "delete_message":
+            by_channel.setdefault(parts[0], []).append(parts[1])
+        elif action == "kick_user":
+            calls.append(run([target_id], client.kick_user(parts[0], parts[1], reason)))
+        else:
+            calls.append(run([target_id], client.ban_user(parts[0], parts[1], reason)))
+
+    oldest_bulk_id = snowflake_from_datetime(datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE)
+    for channel_id, message_ids in by_channel.items():
+        recent = [m for m in message_ids if int(m) > oldest_bulk_id]
+        singles = [m for m in message_ids if int(m) <= oldest_bulk_id]
+        for start in range(0, len(recent), BULK_DELETE_MAX):
+            batch = recent[start:start + BULK_DELETE_MAX]
+            if len(batch) == 1:
+                singles.extend(batch)
+                continue
+            calls.append(run([f"{channel_id}:{m}" for m in batch], client.bulk_delete_messages(channel_id, batch)))
+        for message_id in singles:
+            calls.append(run([f"{channel_id}:{message_id}"], client.delete_message(channel_id, message_id)))
+
+    await asyncio.gather(*calls)
+    return [results[target_id] for target_id in dict.fromkeys(target_ids)]
@@ -0,0 +1,221 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+# Path segments whose IDs are "major parameters": Discord keys rate-limit
+# buckets on them, so /channels/1/... and /channels/2/... are limited separately.
+_MAJOR_PARAM = re.compile(r"^/(channels|guilds|webhooks)/(\d+)")
+_SNOWFLAKE = re.compile(r"/\d+")
+
+
+class RateLimitedError(Exception):
+    """Raised when a request is still rate limited after all retries."""
+
+    def __init__(self, route: str, retry_after: float):
+        super().__init__(f"Rate limited on {route}; retry after {retry_after:.2f}s")
+        self.route = route
+        self.retry_after = retry_after
+
+
+class RateLimitBucket:
+    """Tracks one Discord rate-limit bucket and queues requests against it.
+
+    Requests acquire the bucket in FIFO order. When the bucket is exhausted
+    the head of the queue waits for the reset window before sending, so
+    callers are delayed instead of hitting a 429. Until a response has been
+    seen, one request at a time is sent as a probe and the rest wait for its
+    headers; a bucket whose responses carry no limit is not limited.
+    """
+
+    def __init__(self) -> None:
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.window = 0.0  # Longest Reset-After seen: roughly the window length.
+        self.responded = False
+        self._lock = asyncio.Lock()
+        self._probe: Optional[asyncio.Event] = None
+
+    async def acquire(self) -> bool:
+        """Wait for a turn; return whether this request is the probe."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if not self.responded:
+                    if self._probe is None:
+                        self._probe = asyncio.Event()
+                        return True
+                    await self._probe.wait()
+                    continue
+                if self.limit is None and self.reset_at <= now:
+                    # A 429 without bucket headers has expired: unlimited again.
+                    self.remaining = None
+                elif self.reset_at <= now:
+                    # Window has reset: refill from the last known limit. Until
+                    # responses bring the new reset time, assume a full window
+                    # so the queue is not refilled again meanwhile.
+                    self.remaining = self.limit
+                    self.reset_at = now + self.window
+                if self.remaining is None or self.remaining > 0:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return False
+                await asyncio.sleep(self.reset_at - now)
+
+    def release_probe(self) -> None:
+        """Let the requests queued behind a finished probe continue."""
+        if self._probe is not None:
+            self._probe.set()
+            self._probe = None
+
+    def update(self, limit: Optional[int], remaining: Optional[int], reset_after: Optional[float]) -> None:
+        self.responded = True
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            # Responses to requests sent earlier can arrive late with a
+            # higher count; trust whichever has seen more requests.
+            self.remaining = remaining if self.remaining is None else min(self.remaining, remaining)
+        if reset_after is not None:
+            self.reset_at = time.monotonic() + reset_after
+            self.window = max(self.window, reset_after)
+
+    def exhaust(self, retry_after: float) -> None:
+        """Block the bucket until ``retry_after`` seconds from now (after a 429)."""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, time.monotonic() + retry_after)
+
+
+class GlobalRateLimit:
+    """Token bucket for Discord's global per-bot request limit.
+
+    Also honours global 429 responses, which pause every route until the
+    given ``Retry-After`` has passed.
+    """
+
+    def __init__(self, rate: float = 50.0):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, retry_after: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+
+class RateLimiter:
+    """Schedules Discord REST requests against per-route buckets and the global limit.
+
+    Bucket state is learned from the ``X-RateLimit-*`` response headers;
+    ``Retry-After`` on a 429 blocks the offending bucket (or every bucket, for
+    a global limit) so queued requests wait for the reset window. A semaphore
+    caps the number of requests in flight.
+    """
+
+    def __init__(self, max_concurrency: int = 50, global_rate: float = 50.0):
+        self.global_limit = GlobalRateLimit(global_rate)
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._route_hashes: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self.rate_limited_count = 0
+
+    @staticmethod
+    def route_for(method: str, path: str) -> Tuple[str, str]:
+        """Return ``(route, major_parameter)`` for a request path.
+
+        ``route`` is the method plus the path with every ID after the major
+        parameter replaced by a placeholder.
+        """
+        match = _MAJOR_PARAM.match(path)
+        if match:
+            major = match.group(2)
+            rest = _SNOWFLAKE.sub("/{id}", path[match.end():])
+            return f"{method} /{match.group(1)}/{{major}}{rest}", major
+        return f"{method} {_SNOWFLAKE.sub('/{id}', path)}", ""
+
+    def _bucket(self, route: str, major: str) -> RateLimitBucket:
+        key = (self._route_hashes.get(route, route), major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # Adopt the bucket requests queued on before the hash was known.
+            bucket = self._buckets[key] = self._buckets.get((route, major)) or RateLimitBucket()
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, route: str, major: str) -> AsyncIterator[None]:
+        """Wait until a request on ``route`` may be sent, then hold a concurrency slot."""
+        bucket = self._bucket(route, major)
+        probe = await bucket.acquire()
+        try:
+            await self.global_limit.acquire()
+            async with self._concurrency:
+                yield
+        finally:
+            if probe:
+                bucket.release_probe()
+
+    def update(self, route: str, major: str, status: int, headers: Mapping[str, str], body: Any = None) -> float:
+        """Record rate-limit headers from a response.
+
+        Returns the number of seconds to wait before retrying when the
+        response was a 429, otherwise ``0``.
+        """
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash:
+            self._route_hashes[route] = bucket_hash
+        bucket = self._bucket(route, major)
+        # Requests queued before the hash was known wait on the route's own
+        # bucket; if another route's bucket was adopted instead, update both
+        # so that queue drains at the learned rate too.
+        targets = {bucket, self._buckets.get((route, major), bucket)}
+        for target in targets:
+            target.update(
+                _int_header(headers, "X-RateLimit-Limit"),
+                _int_header(headers, "X-RateLimit-Remaining"),
+                _float_header(headers, "X-RateLimit-Reset-After"),
+            )
+        if status != 429:
+            return 0.0
+
+        self.rate_limited_count += 1
+        retry_after = _float_header(headers, "Retry-After")
+        if isinstance(body, dict) and "retry_after" in body:
+            retry_after = float(body["retry_after"])
+        if retry_after is None:
+            retry_after = 1.0
+        is_global = headers.get("X-RateLimit-Global", "").lower() == "true" or (
+            isinstance(body, dict) and body.get("global", False)
+        )
+        if is_global:
+            self.global_limit.block(retry_after)
+        else:
+            for target in targets:
+                target.exhaust(retry_after)
+        return retry_after
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    return int(value) if value is not None else None
+
+
+def _float_header(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    return float(value) if value is not None else None
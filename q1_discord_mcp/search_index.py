@@ -0,0 +1,186 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from models import Message
+
+# Discord snowflakes carry their creation time (ms since this epoch) in the top bits,
+# so time filters become integer range scans on the primary key.
+DISCORD_EPOCH_MS = 1420070400000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    author_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_channel ON messages (channel_id, id);
+CREATE INDEX IF NOT EXISTS messages_author ON messages (author_id, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id TEXT PRIMARY KEY,
+    newest_id INTEGER,
+    synced_at REAL
+);
+"""
+
+
+def snowflake_from_datetime(value: datetime) -> int:
+    """Return the smallest snowflake that could have been created at ``value``."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return max(0, int(value.timestamp() * 1000) - DISCORD_EPOCH_MS) << 22
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every term, ignoring FTS syntax."""
+    terms = query.split()
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class MessageIndex:
+    """Local SQLite FTS5 index of Discord messages.
+
+    Channels are ingested incrementally: ``sync_channel`` only fetches
+    messages newer than the newest one already stored. Searches run against
+    the index, ranked by BM25, across one or all indexed channels.
+    """
+
+    def __init__(self, path: str = "discord_index.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def add_messages(self, messages: Iterable[Message]) -> int:
+        """Store messages (duplicates are ignored) and return how many were new."""
+        rows = [(int(m.id), m.channel_id, m.author_id, m.content, m.timestamp) for m in messages]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO messages (id, channel_id, author_id, content, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            newest: dict = {}
+            for row in rows:
+                newest[row[1]] = max(newest.get(row[1], 0), row[0])
+            self._conn.executemany(
+                "INSERT INTO channels (channel_id, newest_id) VALUES (?, ?) "
+                "ON CONFLICT (channel_id) DO UPDATE SET newest_id = max(coalesce(newest_id, 0), excluded.newest_id)",
+                list(newest.items()),
+            )
+        return added
+
+    def newest_message_id(self, channel_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_id FROM channels WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return str(row[0]) if row and row[0] is not None else None
+
+    def last_synced(self, channel_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM channels WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, channel_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO channels (channel_id, synced_at) VALUES (?, ?) "
+                "ON CONFLICT (channel_id) DO UPDATE SET synced_at = excluded.synced_at",
+                (channel_id, time.time()),
+            )
+
+    def indexed_channels(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT channel_id FROM channels")]
+
+    def search(
+        self,
+        query: str,
+        channel_id: Optional[str] = None,
+        author_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 10,
+    ) -> List[Message]:
+        """Return the best-ranked messages matching every term of ``query``."""
+        match = _fts_query(query)
+        if not match:
+            return []
+        sql = [
+            "SELECT m.id, m.channel_id, m.author_id, m.content, m.timestamp",
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid",
+            "WHERE messages_fts MATCH ?",
+        ]
+        params: list = [match]
+        if channel_id:
+            sql.append("AND m.channel_id = ?")
+            params.append(channel_id)
+        if author_id:
+            sql.append("AND m.author_id = ?")
+            params.append(author_id)
+        if since:
+            sql.append("AND m.id >= ?")
+            params.append(snowflake_from_datetime(since))
+        if until:
+            sql.append("AND m.id < ?")
+            params.append(snowflake_from_datetime(until))
+        sql.append("ORDER BY bm25(messages_fts), m.id DESC LIMIT ?")
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(" ".join(sql), params).fetchall()
+        return [
+            Message(id=str(row[0]), channel_id=row[1], author_id=row[2], content=row[3], timestamp=row[4])
+            for row in rows
+        ]
+
+    async def sync_channel(
+        self,
+        client,
+        channel_id: str,
+        backfill_limit: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> int:
+        """Ingest messages newer than the newest stored one and return how many were added.
+
+        A channel that has never been indexed is backfilled with its newest
+        ``backfill_limit`` messages, or its whole history when that is ``None``.
+        """
+        newest = self.newest_message_id(channel_id)
+        if newest is None and backfill_limit is not None:
+            # First sync with a cap: take the newest messages rather than the oldest.
+            messages = client.iter_channel_messages(channel_id, limit=backfill_limit)
+        else:
+            messages = client.iter_channel_messages(channel_id, after=newest or "0")
+
+        added = 0
+        batch: List[Message] = []
+        async for message in messages:
+            batch.append(message)
+            if len(batch) >= batch_size:
+                added += await asyncio.to_thread(self.add_messages, batch)
+                batch = []
+        added += await asyncio.to_thread(self.add_messages, batch)
+        await asyncio.to_thread(self.mark_synced, channel_id)
+        return added
@@ -0,0 +1,88 @@
+import base64
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from similarity import DEFAULT_BLOCK_ROWS, iter_similarity_blocks, symmetric_pairs, to_percent, upper_pairs
+
+MATRIX_FORMATS = ("full", "float16", "none")
+
+
+def top_k_neighbors(start: int, percent_block: np.ndarray, k: int):
+    """Return the indices and percentages of each row's ``k`` most similar
+    other texts, best first."""
+    rows = np.arange(len(percent_block))
+    masked = percent_block.copy()
+    masked[rows, rows + start] = -np.inf  # A text is not its own neighbour.
+    k = min(k, masked.shape[1] - 1)
+    if k <= 0:
+        return np.empty((len(masked), 0), dtype=np.intp), np.empty((len(masked), 0))
+    top = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(masked, top, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def analyze_embeddings(
+    unit: np.ndarray,
+    threshold_pct: float = 80,
+    matrix: str = "full",
+    top_k: Optional[int] = None,
+    unique_pairs: bool = False,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> Dict[str, Any]:
+    """Build the /analyze response for unit-length embeddings in one pass over
+    the similarity matrix, computed block by block.
+
+    ``matrix`` selects how the matrix is returned: ``"full"`` as nested lists
+    of percentages, ``"float16"`` as base64 little-endian float16 cosine
+    similarities (row-major), or ``"none"``. Clone pairs are returned in both
+    orders under ``clones`` or, with ``unique_pairs``, once as
+    ``[i, j, similarity]`` with ``i < j`` under ``pairs``. ``top_k`` adds each
+    text's nearest neighbours as ``[j, similarity]`` lists.
+    """
+    if matrix not in MATRIX_FORMATS:
+        raise ValueError(f"matrix must be one of {MATRIX_FORMATS}")
+    n = len(unit)
+    full = np.empty((n, n), dtype=np.float64) if matrix == "full" else None
+    half = np.empty((n, n), dtype="<f2") if matrix == "float16" else None
+    pairs, pair_scores, neighbors, neighbor_scores = [], [], [], []
+
+    for start, block in iter_similarity_blocks(unit, block_rows):
+        percent = to_percent(block)
+        if full is not None:
+            full[start:start + len(block)] = percent
+        if half is not None:
+            half[start:start + len(block)] = block
+        block_pairs = upper_pairs(start, percent, threshold_pct)
+        pairs.append(block_pairs)
+        pair_scores.append(percent[block_pairs[:, 0] - start, block_pairs[:, 1]])
+        if top_k:
+            indices, scores = top_k_neighbors(start, percent, top_k)
+            neighbors.append(indices)
+            neighbor_scores.append(scores)
+
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.intp)
+    response: Dict[str, Any] = {}
+    if full is not None:
+        response["matrix"] = full.tolist()
+    if half is not None:
+        response["matrix_float16"] = {
+            "shape": [n, n],
+            "dtype": "float16",
+            "values": "cosine",
+            "data": base64.b64encode(half.tobytes()).decode("ascii"),
+        }
+    if unique_pairs:
+        scores = np.concatenate(pair_scores) if pair_scores else np.empty(0)
+        response["pairs"] = [[int(i), int(j), float(s)] for (i, j), s in zip(pairs, scores)]
+    else:
+        response["clones"] = symmetric_pairs(pairs)
+    if top_k:
+        indices = np.concatenate(neighbors) if neighbors else np.empty((0, 0), dtype=np.intp)
+        scores = np.concatenate(neighbor_scores) if neighbor_scores else np.empty((0, 0))
+        response["neighbors"] = [
+            [[int(j), float(s)] for j, s in zip(row_indices, row_scores)]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+    return response
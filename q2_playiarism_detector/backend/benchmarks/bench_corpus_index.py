@@ -0,0 +1,86 @@
+"""Recall and latency of the LSH corpus index against exact brute force.
+
+Builds an index of ``--corpus`` random unit vectors, then queries it with
+near-duplicates of corpus documents (cosine similarity about 0.85-0.95, the
+"plagiarised" case) and reports:
+
+* build time,
+* p50/p99 query latency for LSH and brute force,
+* recall: the share of exact matches above ``--threshold`` that LSH also returns.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_corpus_index.py --corpus 100000 --queries 200
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_index import CorpusIndex  # noqa: E402
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def main(corpus, queries, dim, k, threshold, num_tables, num_bits):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((corpus, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    directory = tempfile.mkdtemp(prefix="corpus_index_")
+    try:
+        index = CorpusIndex(directory, num_tables=num_tables, num_bits=num_bits)
+        started = time.perf_counter()
+        for start in range(0, corpus, 10000):
+            index.add([f"doc-{i}" for i in range(start, min(start + 10000, corpus))], vectors[start:start + 10000])
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = CorpusIndex(directory)
+        reopen = time.perf_counter() - started
+
+        sources = rng.choice(corpus, size=queries, replace=False)
+        noise = rng.standard_normal((queries, dim), dtype=np.float32)
+        noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+        mix = rng.uniform(0.3, 0.55, size=(queries, 1)).astype(np.float32)
+        probes = vectors[sources] * np.sqrt(1 - mix**2) + noise * mix
+
+        lsh_times, exact_times, found, expected = [], [], 0, 0
+        for probe in probes:
+            started = time.perf_counter()
+            approximate = index.query(probe, k=k, threshold=threshold)
+            lsh_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            exact = index.query_exact(probe, k=k, threshold=threshold)
+            exact_times.append(time.perf_counter() - started)
+            expected += len(exact)
+            found += len({doc_id for doc_id, _ in exact} & {doc_id for doc_id, _ in approximate})
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"corpus={corpus} dim={dim} tables={num_tables} bits={num_bits}")
+    print(f"build={build:.2f}s reopen={reopen:.2f}s")
+    print(f"lsh    p50={percentile_ms(lsh_times, 50):7.2f}ms p99={percentile_ms(lsh_times, 99):7.2f}ms")
+    print(f"exact  p50={percentile_ms(exact_times, 50):7.2f}ms p99={percentile_ms(exact_times, 99):7.2f}ms")
+    print(f"recall={found / expected if expected else float('nan'):.3f} ({found}/{expected} matches >= {threshold})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--tables", type=int, default=32)
+    parser.add_argument("--bits", type=int, default=10)
+    args = parser.parse_args()
+    main(args.corpus, args.queries, args.dim, args.k, args.threshold, args.tables, args.bits)
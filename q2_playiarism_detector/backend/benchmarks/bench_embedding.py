@@ -0,0 +1,68 @@
+"""Compare sequential per-text embedding with the pooled, batched EmbeddingClient.
+
+Starts the stub Ollama server and embeds the same texts three ways:
+
+* ``sequential`` - one /api/embeddings request at a time on a fresh client,
+  as /analyze did before EmbeddingClient.
+* ``concurrent`` - EmbeddingClient on /api/embeddings, bounded concurrency.
+* ``batched``    - EmbeddingClient on /api/embed with batched input.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_embedding.py --texts 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding import EmbeddingClient  # noqa: E402
+from stub_ollama import StubServer  # noqa: E402
+
+
+async def sequential(url, texts):
+    embeddings = []
+    async with httpx.AsyncClient() as client:
+        for text in texts:
+            response = await client.post(f"{url}/api/embeddings", json={"model": "nomic-embed-text", "prompt": text})
+            response.raise_for_status()
+            embeddings.append(response.json()["embedding"])
+    return embeddings
+
+
+async def pooled(url, texts, **kwargs):
+    async with EmbeddingClient(url, **kwargs) as client:
+        return await client.embed(texts)
+
+
+async def main(count, latency, concurrency, batch_size, port):
+    texts = [f"benchmark text number {i}" for i in range(count)]
+    with StubServer(port=port, latency=latency) as stub:
+        runs = {
+            "sequential": lambda: sequential(stub.url, texts),
+            "concurrent": lambda: pooled(stub.url, texts, max_concurrency=concurrency, use_batch_api=False),
+            "batched": lambda: pooled(stub.url, texts, max_concurrency=concurrency, batch_size=batch_size),
+        }
+        for name, run in runs.items():
+            requests_before = stub.requests
+            started = time.perf_counter()
+            embeddings = await run()
+            elapsed = time.perf_counter() - started
+            assert len(embeddings) == count
+            print(f"{name:<11} {elapsed:7.3f}s  {count / elapsed:8.1f} texts/s  requests={stub.requests - requests_before}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--port", type=int, default=11435)
+    args = parser.parse_args()
+    asyncio.run(main(args.texts, args.latency, args.concurrency, args.batch_size, args.port))
@@ -0,0 +1,74 @@
+"""Speed and accuracy of the winnowing fingerprint pre-filter.
+
+Generates ``--texts`` documents of ``--words`` random words each, then plants
+``--planted`` copied passages of ``--passage-words`` words from one document
+into another (re-cased, with different surrounding whitespace). Reports:
+
+* time to fingerprint, index and extract passages, per size,
+* candidate pairs that would reach the embedding path versus all pairs,
+* recall of planted passages and the mean error of their character span
+  boundaries (a copy can extend into neighbouring words by matching letters).
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_fingerprint.py --texts 100 500 2000 --words 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprint import find_shared_passages  # noqa: E402
+
+
+def build_corpus(n, words, planted, passage_words, rng):
+    vocabulary = [f"w{i}{'aeiou'[i % 5]}" for i in range(20000)]
+    docs = [list(rng.choice(vocabulary, words)) for _ in range(n)]
+    plants = []
+    for _ in range(planted):
+        source, target = rng.choice(n, size=2, replace=False)
+        start = int(rng.integers(0, words - passage_words))
+        passage = docs[source][start:start + passage_words]
+        at = int(rng.integers(0, len(docs[target])))
+        docs[target][at:at] = ["\n"] + [word.upper() for word in passage] + ["\n"]
+        plants.append((int(source), int(target), " ".join(passage)))
+    return [" ".join(doc) for doc in docs], plants
+
+
+def main(sizes, words, planted, passage_words):
+    rng = np.random.default_rng(0)
+    print(f"{'texts':>6} {'time (s)':>9} {'candidates':>11} {'all pairs':>10} {'recall':>7} {'span error':>11}")
+    for n in sizes:
+        texts, plants = build_corpus(n, words, planted, passage_words, rng)
+        started = time.perf_counter()
+        pairs = find_shared_passages(texts)
+        elapsed = time.perf_counter() - started
+
+        found, errors = 0, []
+        by_pair = {(pair["i"], pair["j"]): pair for pair in pairs}
+        for source, target, passage in plants:
+            pair = by_pair.get((min(source, target), max(source, target)))
+            if pair is None:
+                continue
+            found += 1
+            key = "a" if source < target else "b"
+            start = texts[source].find(passage)
+            errors.append(min(
+                abs(p[f"{key}_start"] - start) + abs(p[f"{key}_end"] - start - len(passage)) for p in pair["passages"]
+            ) / 2)
+        total = n * (n - 1) // 2
+        print(f"{n:>6} {elapsed:9.2f} {len(pairs):>11} {total:>10} {found / len(plants):7.3f} {np.mean(errors):8.1f} ch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--words", type=int, default=1000)
+    parser.add_argument("--planted", type=int, default=50)
+    parser.add_argument("--passage-words", type=int, default=40)
+    args = parser.parse_args()
+    main(args.texts, args.words, args.planted, args.passage_words)
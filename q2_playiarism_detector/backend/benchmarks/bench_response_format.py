@@ -0,0 +1,63 @@
+"""Payload size and serialisation time of the /analyze response formats.
+
+For each batch size, builds the response with analyze_embeddings and
+serialises it with json.dumps (what FastAPI does for a dict), comparing:
+
+* ``full``     - the default: matrix of percentages plus clones in both orders
+* ``pairs``    - matrix omitted, clone pairs once (i < j) with similarity
+* ``top5``     - matrix omitted, 5 nearest neighbours per text plus pairs
+* ``float16``  - base64 float16 matrix plus pairs
+
+Embeddings are random clusters of near-duplicates so every batch has clones.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_response_format.py --sizes 100 500 1000 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis import analyze_embeddings  # noqa: E402
+from similarity import normalize  # noqa: E402
+
+FORMATS = {
+    "full": {},
+    "pairs": {"matrix": "none", "unique_pairs": True},
+    "top5": {"matrix": "none", "unique_pairs": True, "top_k": 5},
+    "float16": {"matrix": "float16", "unique_pairs": True},
+}
+
+
+def clustered_embeddings(n, dim, rng):
+    centers = rng.standard_normal((max(1, n // 5), dim))
+    return centers[rng.integers(0, len(centers), n)] + rng.standard_normal((n, dim)) * 0.4
+
+
+def main(sizes, dim):
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'format':<8} {'build (ms)':>11} {'json (ms)':>10} {'payload':>12}")
+    for n in sizes:
+        unit = normalize(clustered_embeddings(n, dim, rng))
+        for name, options in FORMATS.items():
+            started = time.perf_counter()
+            response = analyze_embeddings(unit, **options)
+            built = time.perf_counter() - started
+            started = time.perf_counter()
+            payload = json.dumps(response).encode("utf-8")
+            dumped = time.perf_counter() - started
+            print(f"{n:>6} {name:<8} {built * 1000:11.1f} {dumped * 1000:10.1f} {len(payload) / 1024:9.1f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--dim", type=int, default=768)
+    args = parser.parse_args()
+    main(args.sizes, args.dim)
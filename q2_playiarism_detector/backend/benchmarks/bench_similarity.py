@@ -0,0 +1,79 @@
+"""Benchmark the vectorized similarity matrix against the old scipy double loop.
+
+Uses random 768-dimensional embeddings (the size of nomic-embed-text). The
+loop is only timed up to ``--max-loop-n`` texts; beyond that its time is
+extrapolated from the measured per-pair cost and marked ``est``.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_similarity.py --sizes 10 100 500 1000 2000 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.spatial.distance import cosine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis import analyze_embeddings  # noqa: E402
+from similarity import normalize  # noqa: E402
+
+
+def loop_analyze(embeddings):
+    """The pre-vectorization implementation of /analyze's matrix step."""
+    matrix = []
+    clones = []
+    for i in range(len(embeddings)):
+        row = []
+        for j in range(len(embeddings)):
+            sim = 1 - cosine(embeddings[i], embeddings[j])
+            sim_pct = round(sim * 100, 2)
+            row.append(sim_pct)
+            if i != j and sim_pct >= 80:
+                clones.append((i, j))
+        matrix.append(row)
+    return matrix, clones
+
+
+def vectorized_analyze(embeddings):
+    """/analyze's matrix step as it runs now, full matrix included."""
+    response = analyze_embeddings(normalize(embeddings), threshold_pct=80)
+    return response["matrix"], response["clones"]
+
+
+def main(sizes, dim, max_loop_n):
+    rng = np.random.default_rng(0)
+    per_pair = None
+    print(f"{'n':>6} {'loop (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in sizes:
+        embeddings = rng.normal(size=(n, dim)).tolist()
+
+        started = time.perf_counter()
+        vectorized_analyze(embeddings)
+        vectorized = time.perf_counter() - started
+
+        if n <= max_loop_n:
+            started = time.perf_counter()
+            loop_analyze(embeddings)
+            loop = time.perf_counter() - started
+            per_pair = loop / (n * n)
+            label = f"{loop:12.3f}"
+        elif per_pair is not None:
+            loop = per_pair * n * n
+            label = f"{loop:8.1f} est"
+        else:
+            print(f"{n:>6} {'skipped':>12} {vectorized:15.4f}")
+            continue
+        print(f"{n:>6} {label} {vectorized:15.4f} {loop / vectorized:8.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000, 2000, 5000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--max-loop-n", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.sizes, args.dim, args.max_loop_n)
@@ -0,0 +1,18 @@
+"""Local stand-in for Ollama's embedding API, used by the benchmarks; shared
+by both backends (``ollama_embeddings/stub.py`` at the repository root).
+
+    python benchmarks/stub_ollama.py --port 11435 --latency 0.02 [--mode words]
+
+Point the backend at it with ``OLLAMA_URL=http://127.0.0.1:11435``.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from ollama_embeddings.stub import StubServer, build_app, fake_embedding, main  # noqa: E402,F401
+
+if __name__ == "__main__":
+    main()
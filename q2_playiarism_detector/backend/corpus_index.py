@@ -0,0 +1,158 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from similarity import normalize
+
+
+class CorpusIndex:
+    """Persistent nearest-neighbour index over normalised document embeddings.
+
+    Uses random-projection LSH: each of ``num_tables`` tables hashes a vector
+    to the signs of ``num_bits`` random projections, and documents sharing a
+    bucket with the query in any table become candidates. Candidates are
+    re-ranked by exact cosine similarity, so only a small fraction of the
+    corpus is touched per query. More bits make buckets smaller (faster, lower
+    recall); more tables raise recall.
+
+    On disk, ``directory`` holds ``vectors.f32`` (append-only unit vectors,
+    memory-mapped for reads), ``ids.jsonl`` (one document ID per row) and
+    ``meta.json``. Projections are regenerated from the stored seed, and
+    buckets are rebuilt when the index is opened.
+    """
+
+    def __init__(self, directory: str, num_tables: int = 32, num_bits: int = 10, seed: int = 0):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.jsonl")
+        self.dim: Optional[int] = None
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.seed = seed
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.dim, self.num_tables, self.num_bits, self.seed = (
+                meta["dim"], meta["num_tables"], meta["num_bits"], meta["seed"]
+            )
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._planes: Optional[np.ndarray] = None
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.num_tables)]
+        self._vectors: Optional[np.ndarray] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _load(self) -> None:
+        if self.dim is None or not os.path.exists(self.ids_path):
+            return
+        with open(self.ids_path) as f:
+            ids = [json.loads(line) for line in f if line.endswith("\n")]
+        rows = min(len(ids), os.path.getsize(self.vectors_path) // (self.dim * 4))
+        if rows < len(ids):
+            # Drop IDs left behind by an interrupted add so rows and IDs stay aligned.
+            with open(self.ids_path, "w") as f:
+                f.writelines(json.dumps(doc_id) + "\n" for doc_id in ids[:rows])
+        self.ids = ids[:rows]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        if rows:
+            self._map_vectors()
+            self._index_rows(0, self._signatures(self._vectors))
+
+    def _init_planes(self) -> np.ndarray:
+        if self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.dim, self.num_tables * self.num_bits)).astype(np.float32)
+        return self._planes
+
+    def _signatures(self, unit: np.ndarray) -> np.ndarray:
+        """Return an (n, num_tables) array of bucket keys."""
+        bits = (np.asarray(unit) @ self._init_planes()) > 0
+        bits = bits.reshape(len(bits), self.num_tables, self.num_bits)
+        return bits @ (1 << np.arange(self.num_bits, dtype=np.int64))
+
+    def _index_rows(self, first_row: int, signatures: np.ndarray) -> None:
+        rows = np.arange(first_row, first_row + len(signatures))
+        for table, buckets in enumerate(self._buckets):
+            keys = signatures[:, table]
+            order = np.argsort(keys, kind="stable")
+            unique, starts = np.unique(keys[order], return_index=True)
+            for key, group in zip(unique.tolist(), np.split(rows[order], starts[1:])):
+                buckets.setdefault(key, []).extend(group.tolist())
+
+    def _map_vectors(self) -> None:
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim))
+
+    def add(self, doc_ids: Sequence[str], embeddings) -> Tuple[int, int]:
+        """Add documents; IDs already in the index are skipped.
+
+        Returns ``(added, skipped)``.
+        """
+        unit = normalize(embeddings)
+        keep = []
+        seen = set()
+        for i, doc_id in enumerate(doc_ids):
+            if doc_id not in self.rows and doc_id not in seen:
+                keep.append(i)
+                seen.add(doc_id)
+        if not keep:
+            return 0, len(doc_ids)
+        unit = unit[keep]
+        if self.dim is None:
+            self.dim = unit.shape[1]
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim, "num_tables": self.num_tables, "num_bits": self.num_bits, "seed": self.seed}, f)
+
+        first_row = len(self.ids)
+        # Vectors go first so an interrupted add never leaves an ID without a vector.
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(first_row * self.dim * 4)
+            f.write(np.ascontiguousarray(unit).tobytes())
+        with open(self.ids_path, "a") as f:
+            f.writelines(json.dumps(doc_ids[i]) + "\n" for i in keep)
+        for row, i in enumerate(keep, start=first_row):
+            self.ids.append(doc_ids[i])
+            self.rows[doc_ids[i]] = row
+        self._index_rows(first_row, self._signatures(unit))
+        self._map_vectors()
+        return len(keep), len(doc_ids) - len(keep)
+
+    def _rank(self, unit_query: np.ndarray, rows: Optional[np.ndarray], k: int, threshold: float) -> List[Tuple[str, float]]:
+        """Return the top ``k`` of ``rows`` (every row when ``None``) by similarity."""
+        if rows is None:
+            scores = self._vectors @ unit_query
+            rows = np.arange(len(scores))
+        elif len(rows):
+            scores = self._vectors[rows] @ unit_query
+        else:
+            return []
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[rows[i]], float(scores[i])) for i in top if scores[i] >= threshold]
+
+    def query(self, embedding, k: int = 10, threshold: float = 0.8) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(doc_id, cosine similarity)`` pairs at or above
+        ``threshold``, best first, from the LSH candidates."""
+        if not self.ids:
+            return []
+        unit_query = normalize([embedding])[0]
+        keys = self._signatures(unit_query[None, :])[0].tolist()
+        candidates = [self._buckets[table].get(key, ()) for table, key in enumerate(keys)]
+        rows = np.unique(np.fromiter((row for bucket in candidates for row in bucket), dtype=np.int64))
+        return self._rank(unit_query, rows, k, threshold)
+
+    def query_exact(self, embedding, k: int = 10, threshold: float = 0.8) -> List[Tuple[str, float]]:
+        """Brute-force version of ``query`` over the whole corpus."""
+        if not self.ids:
+            return []
+        unit_query = normalize([embedding])[0]
+        return self._rank(unit_query, None, k, threshold)
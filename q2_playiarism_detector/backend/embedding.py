@@ -0,0 +1,10 @@
+"""The Ollama embedding client, shared with the chunking backend
+(``ollama_embeddings/client.py`` at the repository root)."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from ollama_embeddings.client import EMBED_MODEL, OLLAMA_URL, RETRY_STATUSES, EmbeddingClient  # noqa: E402,F401
@@ -0,0 +1,214 @@
+import re
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# k-gram length and winnowing window, in normalised characters. Any passage
+# shared by two texts that is at least k + window - 1 characters long (about
+# nine words with the defaults) is guaranteed to share a fingerprint.
+DEFAULT_K = 25
+DEFAULT_WINDOW = 20
+
+# Fingerprints found in more texts than this are ignored by default: they are
+# boilerplate, and would add len(docs)**2 / 2 candidate pairs each.
+DEFAULT_MAX_DOC_FREQUENCY = 50
+
+# Characters that are not letters or digits (str.isalnum).
+_NOT_ALNUM = re.compile(r"[\W_]")
+
+_BASE = np.uint64(0x100000001B3)
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def normalize_text(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep only letters and digits, lower-cased, so whitespace, punctuation
+    and case changes do not hide a copy.
+
+    Returns the character codes and, for each, its offset in ``text``.
+    """
+    # Other characters become NUL, lower-casing is done on the whole string,
+    # and the kept characters are picked out of its UTF-32 code points.
+    masked = _NOT_ALNUM.sub("\0", text).replace("Σ", "σ")  # No context-dependent final sigma.
+    lowered = masked.lower()
+    if len(lowered) != len(masked):  # Some characters lower-case to several; keep the first.
+        lowered = "".join(c.lower()[0] for c in masked)
+    codes = np.frombuffer(lowered.encode("utf-32-le"), dtype=np.uint32)
+    offsets = np.flatnonzero(codes)
+    return codes[offsets].astype(np.uint64), offsets.astype(np.int64)
+
+
+def kgram_hashes(codes: np.ndarray, k: int) -> np.ndarray:
+    """Return a 64-bit hash of every k-gram of ``codes``."""
+    m = len(codes) - k + 1
+    if m <= 0:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.zeros(m, dtype=np.uint64)
+    for t in range(k):  # Polynomial hash, wrapping modulo 2**64.
+        hashes = hashes * _BASE + codes[t:t + m]
+    hashes ^= hashes >> np.uint64(31)
+    hashes *= _MIX
+    hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def winnow(hashes: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Select the minimum hash of every ``window`` consecutive hashes (the
+    rightmost on ties), as in Schleimer et al., "Winnowing: Local Algorithms
+    for Document Fingerprinting".
+
+    Returns the selected hashes and their k-gram positions.
+    """
+    if len(hashes) == 0:
+        return hashes, np.empty(0, dtype=np.int64)
+    window = min(window, len(hashes))
+    windows = sliding_window_view(hashes, window)
+    rightmost = window - 1 - np.argmin(windows[:, ::-1], axis=1)
+    positions = np.unique(np.arange(len(windows)) + rightmost)
+    return hashes[positions], positions
+
+
+class Fingerprints:
+    """Winnowed fingerprints of one text."""
+
+    def __init__(self, text: str, k: int = DEFAULT_K, window: int = DEFAULT_WINDOW):
+        self.codes, self.offsets = normalize_text(text)
+        self.hashes, self.positions = winnow(kgram_hashes(self.codes, k), window)
+
+    def char_span(self, start: int, stop: int) -> Tuple[int, int]:
+        """Map normalised positions ``start:stop`` to offsets in the original text."""
+        return int(self.offsets[start]), int(self.offsets[stop - 1]) + 1
+
+
+class FingerprintIndex:
+    """Inverted index from fingerprint hash to the texts containing it.
+
+    Pairs of texts that share fingerprints are found by walking the posting
+    lists, so the cost grows with the number of shared fingerprints rather
+    than with the number of pairs. Fingerprints found in more than
+    ``max_doc_frequency`` texts (boilerplate such as a shared assignment
+    prompt) are ignored; ``None`` keeps them all.
+    """
+
+    def __init__(
+        self, k: int = DEFAULT_K, window: int = DEFAULT_WINDOW, max_doc_frequency: Optional[int] = DEFAULT_MAX_DOC_FREQUENCY
+    ):
+        self.k = k
+        self.window = window
+        self.max_doc_frequency = max_doc_frequency
+        self.docs: List[Fingerprints] = []
+        self.postings: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, text: str) -> int:
+        """Fingerprint and index ``text``; returns its document number."""
+        doc = len(self.docs)
+        fingerprints = Fingerprints(text, self.k, self.window)
+        self.docs.append(fingerprints)
+        for value in np.unique(fingerprints.hashes).tolist():
+            self.postings.setdefault(value, []).append(doc)
+        return doc
+
+    def candidate_pairs(self, min_shared: int = 1) -> Dict[Tuple[int, int], int]:
+        """Return ``{(i, j): shared fingerprint count}`` for ``i < j`` pairs
+        sharing at least ``min_shared`` fingerprints."""
+        shared: Dict[Tuple[int, int], int] = {}
+        for docs in self.postings.values():
+            if len(docs) < 2 or (self.max_doc_frequency and len(docs) > self.max_doc_frequency):
+                continue
+            for pair in combinations(docs, 2):
+                shared[pair] = shared.get(pair, 0) + 1
+        return {pair: count for pair, count in shared.items() if count >= min_shared}
+
+    def shared_passages(self, i: int, j: int, min_length: int = 0) -> List[Tuple[int, int, int, int]]:
+        """Return ``(a_start, a_end, b_start, b_end)`` character spans of the
+        passages texts ``i`` and ``j`` have in common, in order of position in
+        text ``i``.
+
+        Matching fingerprints at the same relative offset in both texts, no
+        more than one window apart, are merged into one passage, which is then
+        extended character by character while both texts still agree (the
+        first and last fingerprints need not sit at the passage's edges).
+        Passages shorter than ``min_length`` normalised characters are dropped.
+        """
+        a, b = self.docs[i], self.docs[j]
+        in_b: Dict[int, List[int]] = {}
+        for value, position in zip(b.hashes.tolist(), b.positions.tolist()):
+            in_b.setdefault(value, []).append(position)
+        matches = [
+            (pb - pa, pa)
+            for value, pa in zip(a.hashes.tolist(), a.positions.tolist())
+            for pb in in_b.get(value, ())
+        ]
+        matches.sort()
+
+        runs: List[Tuple[int, int, int]] = []  # (diagonal, first k-gram, last k-gram)
+        for diagonal, pa in matches:
+            if runs and runs[-1][0] == diagonal and pa - runs[-1][2] <= self.window:
+                runs[-1] = (diagonal, runs[-1][1], pa)
+            else:
+                runs.append((diagonal, pa, pa))
+
+        spans: List[Tuple[int, int, int]] = []  # (diagonal, start, stop) in normalised characters
+        for diagonal, first, last in runs:
+            stop = last + self.k
+            if spans and spans[-1][0] == diagonal and first <= spans[-1][2]:
+                continue  # Already covered by extending the previous run.
+            while first > 0 and first + diagonal > 0 and a.codes[first - 1] == b.codes[first + diagonal - 1]:
+                first -= 1
+            while stop < len(a.codes) and stop + diagonal < len(b.codes) and a.codes[stop] == b.codes[stop + diagonal]:
+                stop += 1
+            spans.append((diagonal, first, stop))
+
+        passages = [
+            (*a.char_span(start, stop), *b.char_span(start + diagonal, stop + diagonal))
+            for diagonal, start, stop in spans
+            if stop - start >= min_length
+        ]
+        # Repeated text inside one document aligns on several diagonals; keep
+        # only passages not contained in a longer one in both texts.
+        passages = [
+            p for p in passages
+            if not any(q != p and q[0] <= p[0] and p[1] <= q[1] and q[2] <= p[2] and p[3] <= q[3] for q in passages)
+        ]
+        passages.sort()
+        return passages
+
+
+def find_shared_passages(
+    texts: List[str],
+    k: int = DEFAULT_K,
+    window: int = DEFAULT_WINDOW,
+    min_length: int = 50,
+    max_doc_frequency: Optional[int] = DEFAULT_MAX_DOC_FREQUENCY,
+) -> List[Dict[str, Any]]:
+    """Fingerprint ``texts`` and return every ``i < j`` pair with at least one
+    shared passage of ``min_length`` normalised characters.
+
+    Each result has the pair, the number of shared fingerprints, ``overlap``
+    (shared fingerprints as a percentage of the smaller text's) and the
+    passages as character spans in both texts.
+    """
+    index = FingerprintIndex(k, window, max_doc_frequency)
+    for text in texts:
+        index.add(text)
+    results = []
+    for (i, j), shared in sorted(index.candidate_pairs().items()):
+        passages = index.shared_passages(i, j, min_length)
+        if not passages:
+            continue
+        smaller = min(len(index.docs[i].hashes), len(index.docs[j].hashes))
+        results.append({
+            "i": i,
+            "j": j,
+            "shared_fingerprints": shared,
+            "overlap": round(100 * shared / smaller, 2),
+            "passages": [
+                {"a_start": a_start, "a_end": a_end, "b_start": b_start, "b_end": b_end}
+                for a_start, a_end, b_start, b_end in passages
+            ],
+        })
+    return results
@@ -0,0 +1,148 @@
+import asyncio
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from similarity import normalize, upper_block_pairs
+
+# Texts per embed call (all calls are in flight at once; progress advances as
+# each one finishes), and matrix rows compared per streamed block.
+EMBED_CHUNK = 64
+JOB_BLOCK_ROWS = 256
+
+
+class AnalysisJob:
+    """A batch similarity analysis running in the background.
+
+    Clone pairs are appended as each block of the matrix is finished, so
+    readers can stream them before the job is done. Only pairs are kept,
+    never the full matrix.
+    """
+
+    def __init__(self, texts: List[str], threshold_pct: float):
+        self.id = uuid.uuid4().hex
+        self.texts: Optional[List[str]] = texts
+        self.threshold_pct = threshold_pct
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.total_texts = len(texts)
+        self.embedded = 0
+        self.total_blocks = -(-len(texts) // JOB_BLOCK_ROWS)
+        self.compared_blocks = 0
+        self.pairs: List[dict] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "total_texts": self.total_texts,
+            "embedded": self.embedded,
+            "total_blocks": self.total_blocks,
+            "compared_blocks": self.compared_blocks,
+            "clones_found": len(self.pairs),
+        }
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def run(self, embed) -> None:
+        """Embed the texts with ``embed`` (an async list -> array function), then
+        compare them block by block."""
+        try:
+            self.status = "embedding"
+
+            async def embed_slice(texts: List[str]):
+                vectors = await embed(texts)
+                self.embedded += len(texts)
+                await self._notify()
+                return vectors
+
+            # The embedding client bounds the requests in flight, so sending
+            # every slice at once keeps it busy without overloading Ollama.
+            tasks = [
+                asyncio.ensure_future(embed_slice(self.texts[start:start + EMBED_CHUNK]))
+                for start in range(0, self.total_texts, EMBED_CHUNK)
+            ]
+            try:
+                chunks = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            self.texts = None
+            unit = normalize([vector for chunk in chunks for vector in chunk])
+            del chunks
+
+            self.status = "comparing"
+            for start in range(0, self.total_texts, JOB_BLOCK_ROWS):
+                stop = min(start + JOB_BLOCK_ROWS, self.total_texts)
+                pairs, percents = await asyncio.to_thread(upper_block_pairs, unit, start, stop, self.threshold_pct)
+                self.pairs.extend(
+                    {"i": int(i), "j": int(j), "similarity": float(p)} for (i, j), p in zip(pairs, percents)
+                )
+                self.compared_blocks += 1
+                await self._notify()
+            self.status = "done"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.texts = None
+            self.finished_at = time.time()
+            await self._notify()
+
+    async def stream_pairs(self) -> AsyncIterator[dict]:
+        """Yield clone pairs as they are found, until the job finishes."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: sent < len(self.pairs) or self.finished)
+            while sent < len(self.pairs):
+                yield self.pairs[sent]
+                sent += 1
+            if self.finished:
+                return
+
+
+class JobManager:
+    """Keeps running and recently finished jobs; finished jobs expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = 3600.0):
+        self.ttl = ttl
+        self.jobs: Dict[str, AnalysisJob] = {}
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, texts: List[str], threshold_pct: float, embed) -> AnalysisJob:
+        self._prune()
+        job = AnalysisJob(texts, threshold_pct)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(job.run(embed))
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        return True
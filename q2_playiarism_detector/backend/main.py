@@ -1,13 +1,45 @@
-from fastapi import FastAPI, Request
-from pydantic import BaseModel
-from typing import List
-from scipy.spatial.distance import cosine
-import httpx
+import os
+from contextlib import asynccontextmanager
+import json
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from embedding import EmbeddingClient
+from embedding_cache import EmbeddingCache
+from corpus_index import CorpusIndex
+from jobs import JobManager
+from analysis import analyze_embeddings
+from fingerprint import DEFAULT_K, DEFAULT_MAX_DOC_FREQUENCY, DEFAULT_WINDOW, find_shared_passages
+from similarity import normalize
 # import subprocess
 # import json
 
-app = FastAPI()
+# One embedding client for the app's lifetime, so connections to Ollama are pooled.
+embedding_client = EmbeddingClient()
+# Texts are embedded once per model; repeats are served from memory or the on-disk store.
+embedding_cache = EmbeddingCache(
+    os.getenv("EMBED_CACHE_DIR", "embedding_cache") or None,
+    memory_budget_bytes=int(os.getenv("EMBED_CACHE_MEMORY_MB", "256")) * 2**20,
+    readonly=os.getenv("EMBED_CACHE_READONLY", "") == "1",
+)
+
+# Archive of past submissions for corpus-scale clone checks.
+corpus_index = CorpusIndex(os.getenv("CORPUS_INDEX_DIR", "corpus_index"))
+
+# Background analyses for large batches, polled and streamed by job ID.
+job_manager = JobManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await embedding_client.start()
+    yield
+    await embedding_client.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -17,35 +49,131 @@ app.add_middleware(
 )
 class TextRequest(BaseModel):
     texts: List[str]
+    threshold: float = Field(80, ge=0, le=100, description="Minimum similarity percentage for a clone pair.")
+    matrix: Literal["full", "float16", "none"] = Field(
+        "full", description="Full matrix as percentages, base64 float16 cosine similarities, or omitted."
+    )
+    top_k: Optional[int] = Field(None, ge=1, description="Also return each text's k nearest neighbours.")
+    unique_pairs: bool = Field(False, description="Return clone pairs once (i < j) with their similarity.")
 
-async def get_embeddings(texts: List[str]) -> List[List[float]]:
-    embeddings = []
-    async with httpx.AsyncClient() as client:
-        for text in texts:
-            response = await client.post(
-                "http://localhost:11434/api/embeddings",
-                json={"model": "nomic-embed-text", "prompt": text}
-            )
-            response.raise_for_status()
-            data = response.json()
-            embeddings.append(data["embedding"])
-    return embeddings
+class JobRequest(BaseModel):
+    texts: List[str]
+    threshold: float = Field(80, ge=0, le=100, description="Minimum similarity percentage for a clone pair.")
+
+class PassageRequest(BaseModel):
+    texts: List[str]
+    k: int = Field(DEFAULT_K, ge=5, le=200, description="k-gram length in normalised characters.")
+    window: int = Field(DEFAULT_WINDOW, ge=1, le=200, description="Winnowing window in k-grams.")
+    min_length: int = Field(50, ge=1, description="Shortest passage to report, in normalised characters.")
+    max_doc_frequency: Optional[int] = Field(
+        DEFAULT_MAX_DOC_FREQUENCY, ge=2, description="Ignore fingerprints shared by more texts than this (null for no limit)."
+    )
+    semantic: bool = Field(False, description="Embed only the matched pairs and passages to add similarity scores.")
+
+class CorpusDocument(BaseModel):
+    id: str
+    text: str
+
+class CorpusAddRequest(BaseModel):
+    documents: List[CorpusDocument]
+
+class CorpusQueryRequest(BaseModel):
+    text: str
+    k: int = Field(10, ge=1, le=1000)
+    threshold: float = Field(80, ge=0, le=100, description="Minimum similarity percentage.")
+    exact: bool = Field(False, description="Brute-force search instead of the LSH index.")
 
 @app.post("/analyze")
 async def analyze_similarity(data: TextRequest):
     texts = data.texts
-    embeddings = await get_embeddings(texts)
-
-    matrix = []
-    clones = []
-    for i in range(len(texts)):
-        row = []
-        for j in range(len(texts)):
-            sim = 1 - cosine(embeddings[i], embeddings[j])
-            sim_pct = round(sim * 100, 2)
-            row.append(sim_pct)
-            if i != j and sim_pct >= 80:
-                clones.append((i, j))
-        matrix.append(row)
-
-    return {"matrix": matrix, "clones": clones}
+    embeddings = await embedding_cache.embed(embedding_client, texts)
+
+    unit = normalize(embeddings)
+    return analyze_embeddings(
+        unit,
+        threshold_pct=data.threshold,
+        matrix=data.matrix,
+        top_k=data.top_k,
+        unique_pairs=data.unique_pairs,
+    )
+
+@app.post("/passages")
+async def shared_passages(data: PassageRequest):
+    """Find passages shared between texts by winnowed fingerprints, without
+    embedding anything unless ``semantic`` is set. Only texts and passages of
+    matched pairs are then embedded."""
+    texts = data.texts
+    pairs = find_shared_passages(texts, data.k, data.window, data.min_length, data.max_doc_frequency)
+    if data.semantic and pairs:
+        docs = sorted({pair[key] for pair in pairs for key in ("i", "j")})
+        snippets = [
+            text
+            for pair in pairs
+            for passage in pair["passages"]
+            for text in (
+                texts[pair["i"]][passage["a_start"]:passage["a_end"]],
+                texts[pair["j"]][passage["b_start"]:passage["b_end"]],
+            )
+        ]
+        unit = normalize(await embedding_cache.embed(embedding_client, [texts[i] for i in docs] + snippets))
+        row = {doc: r for r, doc in enumerate(docs)}
+        snippet_rows = iter(range(len(docs), len(unit), 2))
+        for pair in pairs:
+            pair["similarity"] = round(float(unit[row[pair["i"]]] @ unit[row[pair["j"]]]) * 100, 2)
+            for passage in pair["passages"]:
+                r = next(snippet_rows)
+                passage["similarity"] = round(float(unit[r] @ unit[r + 1]) * 100, 2)
+    return {"pairs": pairs, "total_pairs": len(texts) * (len(texts) - 1) // 2}
+
+@app.post("/jobs")
+async def submit_job(data: JobRequest):
+    """Start a background analysis and return its job ID immediately."""
+    job = job_manager.submit(
+        data.texts, data.threshold, lambda texts: embedding_cache.embed(embedding_client, texts)
+    )
+    return job.progress()
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.progress()
+
+@app.get("/jobs/{job_id}/pairs")
+async def job_pairs(job_id: str):
+    """Stream clone pairs (i < j) as NDJSON as soon as each matrix block is done.
+    The last line reports the job's final status."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def lines():
+        async for pair in job.stream_pairs():
+            yield json.dumps(pair) + "\n"
+        yield json.dumps({"status": job.status, "error": job.error}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No running job with this ID")
+    return {"job_id": job_id, "status": "cancelling"}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return embedding_cache.stats()
+
+@app.post("/corpus/add")
+async def corpus_add(data: CorpusAddRequest):
+    embeddings = await embedding_cache.embed(embedding_client, [doc.text for doc in data.documents])
+    added, skipped = corpus_index.add([doc.id for doc in data.documents], embeddings)
+    return {"added": added, "skipped": skipped, "size": len(corpus_index)}
+
+@app.post("/corpus/query")
+async def corpus_query(data: CorpusQueryRequest):
+    embedding = (await embedding_cache.embed(embedding_client, [data.text]))[0]
+    search = corpus_index.query_exact if data.exact else corpus_index.query
+    matches = search(embedding, k=data.k, threshold=data.threshold / 100)
+    return {"matches": [{"id": doc_id, "similarity": round(sim * 100, 2)} for doc_id, sim in matches]}
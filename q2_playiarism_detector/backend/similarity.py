@@ -0,0 +1,61 @@
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# Rows of the similarity matrix computed per matrix multiply. A block holds
+# block_rows * n float32 values, which bounds memory for very large batches.
+DEFAULT_BLOCK_ROWS = 1024
+
+
+def normalize(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Stack embeddings into a float32 array of unit-length rows.
+
+    Zero vectors are left as zeros, so they are 0% similar to everything.
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if vectors.size == 0:
+        return np.zeros((len(vectors), 0), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def iter_similarity_blocks(unit: np.ndarray, block_rows: int = DEFAULT_BLOCK_ROWS) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(row_start, block)`` where ``block`` is the cosine similarity of
+    rows ``row_start:row_start + block_rows`` against every row."""
+    for start in range(0, len(unit), block_rows):
+        yield start, unit[start:start + block_rows] @ unit.T
+
+
+def to_percent(similarity: np.ndarray) -> np.ndarray:
+    """Convert cosine similarity to a percentage rounded to two decimals."""
+    return np.round(similarity.astype(np.float64) * 100, 2)
+
+
+def upper_pairs(start: int, percent_block: np.ndarray, threshold_pct: float) -> np.ndarray:
+    """Return the ``(i, j)`` pairs with ``i < j`` in a row block starting at row
+    ``start`` whose similarity percentage is at least ``threshold_pct``."""
+    rows = np.arange(start, start + len(percent_block))[:, None]
+    cols = np.arange(percent_block.shape[1])[None, :]
+    i, j = np.nonzero((percent_block >= threshold_pct) & (cols > rows))
+    return np.stack([i + start, j], axis=1)
+
+
+def upper_block_pairs(
+    unit: np.ndarray, start: int, stop: int, threshold_pct: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compare rows ``start:stop`` with every row from ``start`` on (the upper
+    triangle only) and return the ``i < j`` pairs at or above ``threshold_pct``
+    together with their similarity percentages."""
+    percent = to_percent(unit[start:stop] @ unit[start:].T)
+    rows = np.arange(len(percent))[:, None]
+    cols = np.arange(percent.shape[1])[None, :]
+    i, j = np.nonzero((percent >= threshold_pct) & (cols > rows))
+    return np.stack([i + start, j + start], axis=1), percent[i, j]
+
+
+def symmetric_pairs(pairs: np.ndarray) -> List[Tuple[int, int]]:
+    """Expand ``i < j`` pairs to both orders, sorted row-major like a full-matrix scan."""
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    order = np.lexsort((both[:, 1], both[:, 0]))
+    return [(int(i), int(j)) for i, j in both[order]]
@@ -1,11 +1,17 @@
 'use client'
 
 import { useState } from 'react'
+import { similarityAPI, AnalysisJob, ClonePair } from '@/lib/api'
+
+// Batches at least this large run as background jobs whose clone pairs stream in.
+const JOB_MODE_MIN_TEXTS = 20
 
 export default function Home() {
   const [inputs, setInputs] = useState<string[]>(['', ''])
   const [matrix, setMatrix] = useState<number[][]>([])
   const [clones, setClones] = useState<[number, number][]>([])
+  const [job, setJob] = useState<AnalysisJob | null>(null)
+  const [streamedPairs, setStreamedPairs] = useState<ClonePair[]>([])
 
   const handleInputChange = (index: number, value: string) => {
     const newInputs = [...inputs]
@@ -15,7 +21,42 @@ export default function Home() {
 
   const addInput = () => setInputs([...inputs, ''])
 
+  const analyzeAsJob = async () => {
+    setMatrix([])
+    setClones([])
+    setStreamedPairs([])
+    const submitted = await similarityAPI.submitJob(inputs)
+    setJob(submitted)
+    const poll = setInterval(async () => {
+      setJob(await similarityAPI.getJob(submitted.job_id))
+    }, 500)
+    // Pairs arriving between frames are rendered together, once per frame.
+    const pending: ClonePair[] = []
+    let frame = 0
+    const flush = () => {
+      frame = 0
+      const batch = pending.splice(0)
+      setStreamedPairs((pairs) => pairs.concat(batch))
+    }
+    try {
+      await similarityAPI.streamPairs(submitted.job_id, (batch) => {
+        for (const pair of batch) pending.push(pair)
+        if (!frame) frame = requestAnimationFrame(flush)
+      })
+    } finally {
+      cancelAnimationFrame(frame)
+      if (pending.length) flush()
+      clearInterval(poll)
+      setJob(await similarityAPI.getJob(submitted.job_id))
+    }
+  }
+
   const analyze = async () => {
+    if (inputs.length >= JOB_MODE_MIN_TEXTS) {
+      return analyzeAsJob()
+    }
+    setJob(null)
+    setStreamedPairs([])
     const response = await fetch('http://localhost:8000/analyze', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
@@ -52,6 +93,23 @@ export default function Home() {
         </button>
       </div>
 
+      {job && (
+        <div className="mb-6">
+          <p className="mb-2">
+            Status: <span className="font-semibold">{job.status}</span> — embedded {job.embedded}/{job.total_texts},
+            compared {job.compared_blocks}/{job.total_blocks} blocks, {streamedPairs.length} clone pairs
+            {job.error && <span className="text-red-700"> ({job.error})</span>}
+          </p>
+          <ul className="space-y-1">
+            {streamedPairs.map((pair) => (
+              <li key={`${pair.i}-${pair.j}`} className="text-red-700">
+                Text {pair.i + 1} ↔ Text {pair.j + 1}: {pair.similarity.toFixed(2)}%
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
+
       {matrix.length > 0 && (
         <div className="overflow-x-auto">
           <table className="table-auto border-collapse border w-full text-center">
@@ -71,6 +71,23 @@ export interface RecommendationResponse {
   recommendations: Product[];
 }
 
+export interface AnalysisJob {
+  job_id: string;
+  status: 'queued' | 'embedding' | 'comparing' | 'done' | 'failed' | 'cancelled';
+  error: string | null;
+  total_texts: number;
+  embedded: number;
+  total_blocks: number;
+  compared_blocks: number;
+  clones_found: number;
+}
+
+export interface ClonePair {
+  i: number;
+  j: number;
+  similarity: number;
+}
+
 // Authentication API
 export const authAPI = {
   register: async (username: string, email: string, password: string): Promise<AuthResponse> => {
@@ -162,6 +179,59 @@ export const recommendationsAPI = {
   },
 };
 
+// Similarity API
+export const similarityAPI = {
+  submitJob: async (texts: string[], threshold: number = 80): Promise<AnalysisJob> => {
+    const response = await api.post('/jobs', { texts, threshold });
+    return response.data;
+  },
+
+  getJob: async (jobId: string): Promise<AnalysisJob> => {
+    const response = await api.get(`/jobs/${jobId}`);
+    return response.data;
+  },
+
+  cancelJob: async (jobId: string) => {
+    const response = await api.delete(`/jobs/${jobId}`);
+    return response.data;
+  },
+
+  // Reads the NDJSON pair stream, calling onPairs with the clone pairs from
+  // each chunk read (one state update per chunk, not per pair).
+  // Resolves with the job's final status line.
+  streamPairs: async (
+    jobId: string,
+    onPairs: (pairs: ClonePair[]) => void
+  ): Promise<{ status: AnalysisJob['status']; error: string | null }> => {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/pairs`);
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to stream pairs: ${response.status}`);
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let final = { status: 'failed' as AnalysisJob['status'], error: 'Stream ended early' as string | null };
+    for (;;) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value, { stream: !done });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      const pairs: ClonePair[] = [];
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const item = JSON.parse(line);
+        if ('status' in item) {
+          final = item;
+        } else {
+          pairs.push(item as ClonePair);
+        }
+      }
+      if (pairs.length) onPairs(pairs);
+      if (done) return final;
+    }
+  },
+};
+
 // User API
 export const userAPI = {
   getProfile: async (): Promise<UserProfile> => {
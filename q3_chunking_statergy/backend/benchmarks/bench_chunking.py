@@ -0,0 +1,110 @@
+"""Time and peak allocation of every chunking strategy, against the previous
+string-building implementations.
+
+The previous chunkers built each chunk with repeated ``+=`` and returned
+lists of dicts holding copies of the text. The new ones yield ``Chunk`` spans
+over the source text. Both are measured as "spans only" (consume the
+generator) and "serialised" (``to_dict`` for every chunk, as ``/upload/``
+does).
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_chunking.py --pages 100 1000 5000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import STRATEGIES, chunk_pages  # noqa: E402
+from make_pdf import page_lines  # noqa: E402
+
+
+def previous_fixed(text, chunk_size, overlap):
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunk = text[start:end]
+        chunks.append({"text": chunk, "start": start, "end": end, "size": len(chunk)})
+        start += chunk_size - overlap
+    return chunks
+
+
+def previous_recursive(text, chunk_size, overlap):
+    chunks, current = [], ""
+    for para in text.split("\n\n"):
+        if len(current) + len(para) < chunk_size:
+            current += para + "\n\n"
+        else:
+            chunks.append({"text": current.strip(), "size": len(current)})
+            current = para
+    if current:
+        chunks.append({"text": current.strip(), "size": len(current)})
+    return chunks
+
+
+def previous_document(text, chunk_size, overlap):
+    return [{"text": text.strip(), "size": len(text)}]
+
+
+def previous_semantic(text, chunk_size, overlap):
+    chunks, current = [], ""
+    for sentence in re.split(r"(?<=[.!?]) +", text):
+        if len(current) + len(sentence) < chunk_size:
+            current += sentence + " "
+        else:
+            chunks.append(current.strip())
+            current = sentence
+    if current:
+        chunks.append(current.strip())
+    return [{"text": chunk, "size": len(chunk)} for chunk in chunks]
+
+
+PREVIOUS = {
+    "fixed": previous_fixed,
+    "recursive": previous_recursive,
+    "document": previous_document,
+    "semantic": previous_semantic,
+}
+
+
+def measure(run):
+    """Time one run, then trace allocations in a second (tracing slows it down)."""
+    started = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(pages_list, chunk_size, overlap):
+    rng = random.Random(0)
+    print(f"{'pages':>6} {'strategy':<10} {'variant':<11} {'chunks':>7} {'time (ms)':>10} {'peak (MB)':>10}")
+    for pages in pages_list:
+        text = "\n".join("\n\n".join(" ".join(page_lines(rng, 8)) for _ in range(6)) for _ in range(pages))
+        for strategy in STRATEGIES:
+            variants = {
+                "previous": lambda: len(PREVIOUS[strategy](text, chunk_size, overlap)),
+                "spans": lambda: sum(1 for _ in chunk_pages([text], strategy, chunk_size, overlap)),
+                "serialised": lambda: len([c.to_dict() for c in chunk_pages([text], strategy, chunk_size, overlap)]),
+            }
+            for name, run in variants.items():
+                count, elapsed, peak = measure(run)
+                print(f"{pages:>6} {strategy:<10} {name:<11} {count:>7} {elapsed * 1000:10.1f} {peak / 2**20:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    args = parser.parse_args()
+    main(args.pages, args.chunk_size, args.overlap)
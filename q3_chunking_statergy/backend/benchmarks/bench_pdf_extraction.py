@@ -0,0 +1,108 @@
+"""Wall time, time to first chunk and peak RSS of PDF extraction plus
+fixed-size chunking, for the previous whole-document path and the
+page-streaming path (in-process and process pool).
+
+Each mode runs in a fresh subprocess so peak RSS is measured independently
+(for the pool, the largest worker's peak is reported separately).
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_pdf_extraction.py --pages 500 1000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from make_pdf import write_pdf  # noqa: E402
+
+MODES = ("previous", "streaming", "parallel")
+
+
+def previous_chunks(path, chunk_size, overlap):
+    """The old path: read the upload into memory, extract every page's text
+    twice, build the whole string, then chunk."""
+    from io import BytesIO
+
+    from PyPDF2 import PdfReader
+
+    with open(path, "rb") as f:
+        content = f.read()
+    reader = PdfReader(BytesIO(content))
+    text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunks.append({"text": text[start:end], "start": start, "end": end, "size": end - start})
+        start += chunk_size - overlap
+    yield from chunks
+
+
+def streaming_chunks(path, chunk_size, overlap, parallel):
+    from chunking import chunk_pages
+    from utils import extract_pages, join_pages
+
+    with open(path, "rb") as f:
+        yield from chunk_pages(join_pages(extract_pages(f, parallel=parallel)), "fixed", chunk_size, overlap)
+
+
+def run_mode(mode, path, chunk_size, overlap):
+    from utils import shutdown_pdf_pool
+
+    started = time.perf_counter()
+    if mode == "previous":
+        chunks = previous_chunks(path, chunk_size, overlap)
+    else:
+        chunks = streaming_chunks(path, chunk_size, overlap, parallel=mode == "parallel")
+    first, count = None, 0
+    for _ in chunks:
+        if first is None:
+            first = time.perf_counter() - started
+        count += 1
+    elapsed = time.perf_counter() - started
+    shutdown_pdf_pool()
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "first_chunk_seconds": first,
+        "chunks": count,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def main(pages_list, chunk_size, overlap):
+    print(f"{'pages':>6} {'mode':<10} {'total (s)':>10} {'first (s)':>10} {'chunks':>7} {'RSS (MB)':>9} {'worker RSS':>11}")
+    for pages in pages_list:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sample.pdf")
+            write_pdf(path, pages)
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--run", mode, path, "--chunk-size", str(chunk_size), "--overlap", str(overlap)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                r = json.loads(output)
+                print(
+                    f"{pages:>6} {mode:<10} {r['seconds']:10.2f} {r['first_chunk_seconds']:10.2f} {r['chunks']:>7} "
+                    f"{r['peak_rss_mb']:9.1f} {r['worker_peak_rss_mb']:11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[500, 1000])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--run", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        print(json.dumps(run_mode(args.run[0], args.run[1], args.chunk_size, args.overlap)))
+    else:
+        main(args.pages, args.chunk_size, args.overlap)
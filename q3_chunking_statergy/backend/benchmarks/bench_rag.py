@@ -0,0 +1,185 @@
+"""Ingestion time, retrieval latency and recall of the RAG pipeline for each
+chunking strategy.
+
+Writes synthetic PDFs with planted facts ("The <a> <b> of <c> is <d> <e>.")
+among random filler, ingests them through ``/rag/ingest`` into one index per
+strategy, then asks "What is the <a> <b> of <c>?" for every fact. A question
+counts as answered when one of the top ``k`` chunks contains the fact's
+answer. Embeddings come from the Ollama stub in ``words`` mode, where texts
+sharing words are similar.
+
+Also compares ingesting the documents one request at a time with one
+concurrent request, and with ``--scale`` times exact and ANN search on
+larger stores of random vectors, queried with noisy copies of stored rows
+(cosine about 0.78); recall there is how often ANN finds the exact top hit.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_rag.py --documents 4 --pages 50 --latency 0.02
+    python benchmarks/bench_rag.py --scale 20000 100000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("EMBED_CACHE_DIR", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_ollama import StubServer  # noqa: E402
+
+STRATEGIES = ("fixed", "recursive", "sentence", "semantic", "document")
+
+
+def made_up_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 9)))
+
+
+def make_corpus(directory, documents, pages, facts_per_document, seed=0):
+    """Write the PDFs; return their paths and ``(question, answer)`` pairs."""
+    from make_pdf import page_lines, write_lines_pdf
+
+    rng = random.Random(seed)
+    paths, questions = [], []
+    for number in range(documents):
+        page_list = [page_lines(rng, 48) for _ in range(pages)]
+        for _ in range(facts_per_document):
+            a, b, c, d, e = (made_up_word(rng) for _ in range(5))
+            lines = rng.choice(page_list)
+            row = rng.randrange(len(lines))
+            lines[row] = f"The {a} {b} of {c} is {d} {e}." if lines[row] else lines[row]
+            if lines[row].startswith(f"The {a} "):
+                questions.append((f"What is the {a} {b} of {c}?", f"{d} {e}"))
+        path = os.path.join(directory, f"doc{number}.pdf")
+        write_lines_pdf(path, page_list)
+        paths.append(path)
+    return paths, questions
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def ingest(client, paths, strategy, index, chunk_size, overlap):
+    files = [("files", (os.path.basename(path), open(path, "rb"), "application/pdf")) for path in paths]
+    started = time.perf_counter()
+    response = client.post("/rag/ingest", params={"index": index, "strategy": strategy, "chunk_size": chunk_size, "overlap": overlap}, files=files)
+    elapsed = time.perf_counter() - started
+    for _, (_, f, _) in files:
+        f.close()
+    response.raise_for_status()
+    return elapsed, response.json()
+
+
+def reset(server, index_dir):
+    from document_cache import DocumentCache
+    from embedding_cache import EmbeddingCache
+
+    server.RAG_INDEX_DIR = index_dir
+    server.chunk_stores.clear()
+    server.document_cache = DocumentCache(None)
+    server.embedding_cache = EmbeddingCache(None)
+
+
+def main(documents, pages, facts, chunk_size, overlap, k, latency, port):
+    with StubServer(port=port, latency=latency, mode="words") as stub, tempfile.TemporaryDirectory() as directory:
+        os.environ["OLLAMA_URL"] = stub.url
+        from fastapi.testclient import TestClient
+
+        import main as server
+        from embedding_cache import text_digest
+
+        paths, questions = make_corpus(directory, documents, pages, facts)
+        print(f"{documents} documents x {pages} pages, {len(questions)} questions, chunk_size={chunk_size} overlap={overlap} k={k}")
+        print(
+            f"{'strategy':<10} {'chunks':>7} {'ingest (s)':>11} {'exact p50 (ms)':>15} {'ann p50 (ms)':>13} "
+            f"{'query p99 (ms)':>15} {'recall':>7} {'ann recall':>11} {'ann/exact':>10}"
+        )
+        with TestClient(server.app) as client:
+            for strategy in STRATEGIES:
+                reset(server, os.path.join(directory, "index"))
+                seconds, result = ingest(client, paths, strategy, strategy, chunk_size, overlap)
+                store = server.chunk_stores[strategy]
+                exact_ms, ann_ms, query_ms, hits, ann_hits, agree = [], [], [], 0, 0, 0
+                for question, answer in questions:
+                    started = time.perf_counter()
+                    response = client.post("/rag/query", params={"question": question, "index": strategy, "k": k})
+                    query_ms.append((time.perf_counter() - started) * 1000)
+                    exact = response.json()["results"]
+                    # The query above cached the question's embedding; time the search alone.
+                    embedding = server.embedding_cache.get(server.embedding_client.model, text_digest(question))
+                    started = time.perf_counter()
+                    store.search(embedding, k)
+                    exact_ms.append((time.perf_counter() - started) * 1000)
+                    started = time.perf_counter()
+                    ann = store.search(embedding, k, ann=True)
+                    ann_ms.append((time.perf_counter() - started) * 1000)
+                    hits += any(answer in chunk["text"] for chunk in exact)
+                    ann_hits += any(answer in chunk["text"] for chunk in ann)
+                    exact_rows = {(c["document_id"], c["start"]) for c in exact}
+                    agree += len(exact_rows & {(c["document_id"], c["start"]) for c in ann}) / max(len(exact_rows), 1)
+                n = len(questions)
+                print(
+                    f"{strategy:<10} {result['total_chunks']:>7} {seconds:11.2f} {percentile(exact_ms, 50):15.2f} "
+                    f"{percentile(ann_ms, 50):13.2f} {percentile(query_ms, 99):15.1f} {hits / n:7.2f} "
+                    f"{ann_hits / n:11.2f} {agree / n:10.2f}"
+                )
+
+            print("\ningestion, recursive strategy")
+            for label, batches in (("one at a time", [[path] for path in paths]), ("concurrent", [paths])):
+                reset(server, os.path.join(directory, f"ingest-{label.replace(' ', '-')}"))
+                started = time.perf_counter()
+                for batch in batches:
+                    ingest(client, batch, "recursive", "default", chunk_size, overlap)
+                print(f"{label:<14} {time.perf_counter() - started:8.2f} s")
+
+
+def scale(sizes, dim=768, queries=100, tables=32, bits=8):
+    from vector_store import ChunkStore
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>8} {'exact p50 (ms)':>15} {'ann p50 (ms)':>13} {'ann recall':>11}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            store = ChunkStore(directory, tables, bits)
+            vectors = rng.standard_normal((n, dim), dtype=np.float32)
+            batch = 10_000
+            for first in range(0, n, batch):
+                rows = vectors[first:first + batch]
+                store.add(f"doc{first}", f"doc{first}", {}, [(i, i + 1) for i in range(len(rows))], [""] * len(rows), rows)
+            exact_ms, ann_ms, found = [], [], 0
+            for row in rng.choice(n, queries, replace=False):
+                noise = rng.standard_normal(dim, dtype=np.float32)
+                query = vectors[row] / np.linalg.norm(vectors[row]) + 0.8 * noise / np.linalg.norm(noise)
+                started = time.perf_counter()
+                exact = store.search(query, 5)
+                exact_ms.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                ann = store.search(query, 5, ann=True)
+                ann_ms.append((time.perf_counter() - started) * 1000)
+                found += (ann[0]["document_id"], ann[0]["start"]) == (exact[0]["document_id"], exact[0]["start"])
+            print(f"{n:>8} {percentile(exact_ms, 50):15.2f} {percentile(ann_ms, 50):13.2f} {found / queries:11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--facts", type=int, default=25, help="Facts planted per document.")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every stub request.")
+    parser.add_argument("--port", type=int, default=11437)
+    parser.add_argument("--scale", type=int, nargs="+", help="Time search alone on stores of this many random chunks.")
+    args = parser.parse_args()
+    if args.scale:
+        scale(args.scale)
+    else:
+        main(args.documents, args.pages, args.facts, args.chunk_size, args.overlap, args.k, args.latency, args.port)
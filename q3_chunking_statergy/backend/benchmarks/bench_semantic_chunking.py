@@ -0,0 +1,61 @@
+"""Cold and warm runs of embedding-driven semantic chunking.
+
+Chunks a synthetic document against the local Ollama stub
+(``stub_ollama.py``) once with an empty sentence cache, then again with other
+chunk sizes and breakpoint percentiles, as happens when a slider moves in the
+Streamlit app. Reports wall time and the number of embedding requests; warm
+runs should make none.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_semantic_chunking.py --pages 50 200 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import sentences  # noqa: E402
+from embedding import EmbeddingClient  # noqa: E402
+from embedding_cache import EmbeddingCache  # noqa: E402
+from make_pdf import page_lines  # noqa: E402
+from semantic import semantic_chunk  # noqa: E402
+from stub_ollama import StubServer  # noqa: E402
+
+RUNS = [("cold", 500, 95), ("warm", 800, 95), ("warm", 500, 80), ("warm", 300, 90)]
+
+
+async def bench(url, text, stub):
+    cache = EmbeddingCache(None)
+    async with EmbeddingClient(base_url=url) as client:
+        for label, chunk_size, percentile in RUNS:
+            before = stub.requests
+            started = time.perf_counter()
+            chunks = await semantic_chunk(text, client, cache, chunk_size, 0, percentile)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:<5} size={chunk_size:<4} pct={percentile:<3} {elapsed:8.3f}s "
+                f"{len(chunks):>6} chunks {stub.requests - before:>5} requests"
+            )
+
+
+def main(pages_list, latency, port):
+    rng = random.Random(0)
+    with StubServer(port=port, latency=latency) as stub:
+        for pages in pages_list:
+            text = "\n".join(" ".join(page_lines(rng, 48)) for _ in range(pages))
+            print(f"pages={pages} chars={len(text)} sentences={len(sentences(text))}")
+            asyncio.run(bench(stub.url, text, stub))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every stub request.")
+    parser.add_argument("--port", type=int, default=11436)
+    args = parser.parse_args()
+    main(args.pages, args.latency, args.port)
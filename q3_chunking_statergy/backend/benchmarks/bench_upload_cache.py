@@ -0,0 +1,82 @@
+"""Latency of /upload/ as a user moves the sliders, with and without the
+document cache.
+
+Runs the FastAPI app in-process against a synthetic PDF and replays a
+sequence of parameter changes (strategy, chunk size, overlap):
+
+* ``no cache``: the previous flow, re-posting the PDF for every change with
+  the cache disabled, so every request re-parses it;
+* ``re-post``: re-posting the PDF, with the cache on (text is reused);
+* ``by ID``: uploading once to ``/documents/`` and sending only the ID.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_upload_cache.py --pages 500
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("EMBED_CACHE_DIR", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as server  # noqa: E402
+from document_cache import DocumentCache  # noqa: E402
+from make_pdf import write_pdf  # noqa: E402
+
+INTERACTIONS = [
+    ("fixed", 500, 50), ("fixed", 800, 50), ("fixed", 800, 100), ("recursive", 800, 100),
+    ("recursive", 500, 100), ("sentence", 500, 0), ("fixed", 500, 50), ("recursive", 800, 100),
+]
+
+
+def replay(client, path, by_id):
+    with open(path, "rb") as f:
+        pdf = f.read()
+    document_id = hashlib.sha256(pdf).hexdigest()
+    timings, sent = [], 0
+    started = time.perf_counter()
+    if by_id:
+        client.post("/documents/", files={"file": pdf})
+        sent += len(pdf)
+    upload = time.perf_counter() - started
+    for strategy, chunk_size, overlap in INTERACTIONS:
+        params = {"strategy": strategy, "chunk_size": chunk_size, "overlap": overlap}
+        started = time.perf_counter()
+        if by_id:
+            response = client.post("/upload/", params={**params, "document_id": document_id})
+        else:
+            response = client.post("/upload/", params=params, files={"file": pdf})
+            sent += len(pdf)
+        response.raise_for_status()
+        timings.append(time.perf_counter() - started)
+    return upload, timings, sent
+
+
+def main(pages):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sample.pdf")
+        write_pdf(path, pages)
+        print(f"pages={pages} pdf={os.path.getsize(path) / 2**20:.1f} MB, {len(INTERACTIONS)} slider changes")
+        print(f"{'flow':<9} {'upload (s)':>11} {'first (s)':>10} {'later p50 (s)':>14} {'total (s)':>10} {'sent (MB)':>10}")
+        for name, budget, by_id in (("no cache", 0, False), ("re-post", 256 * 2**20, False), ("by ID", 256 * 2**20, True)):
+            server.document_cache = DocumentCache(None, memory_budget_bytes=budget)
+            with TestClient(server.app) as client:
+                upload, timings, sent = replay(client, path, by_id)
+            later = sorted(timings[1:])[len(timings[1:]) // 2]
+            print(
+                f"{name:<9} {upload:11.2f} {timings[0]:10.2f} {later:14.3f} "
+                f"{upload + sum(timings):10.2f} {sent / 2**20:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+    main(args.pages)
@@ -0,0 +1,84 @@
+"""Time to first chunk, total time and response size of /upload/ for the
+three response forms: the whole chunk list, the NDJSON stream and one page
+of chunks with size statistics.
+
+Runs the app under uvicorn in a background thread (the test client buffers
+whole responses, so it cannot show when the first chunk arrives) and posts a
+synthetic PDF cold, with an empty document cache, then again by
+``document_id`` once it is cached.
+
+Usage (from ``backend/``):
+
+    python benchmarks/bench_upload_stream.py --pages 100 500
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("EMBED_CACHE_DIR", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import main as server  # noqa: E402
+from document_cache import DocumentCache  # noqa: E402
+from make_pdf import write_pdf  # noqa: E402
+
+PORT = 8765
+MODES = {"full": {}, "stream": {"stream": True}, "page": {"offset": 0, "limit": 20}}
+
+
+def start_server():
+    config = uvicorn.Config(server.app, port=PORT, log_level="warning", lifespan="on")
+    uv = uvicorn.Server(config)
+    threading.Thread(target=uv.run, daemon=True).start()
+    while not uv.started:
+        time.sleep(0.05)
+    return uv
+
+
+def request(client, params, files=None):
+    """Seconds to the first body bytes, seconds to the end and bytes received."""
+    started = time.perf_counter()
+    first, received = None, 0
+    with client.stream("POST", "/upload/", params=params, files=files) as response:
+        response.raise_for_status()
+        for block in response.iter_raw():
+            if first is None:
+                first = time.perf_counter() - started
+            received += len(block)
+    return first, time.perf_counter() - started, received
+
+
+def main(pages_list, chunk_size, overlap):
+    uv = start_server()
+    print(f"{'pages':>6} {'mode':<7} {'cache':<5} {'first (s)':>10} {'total (s)':>10} {'response (KB)':>14}")
+    with httpx.Client(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+        for pages in pages_list:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "sample.pdf")
+                write_pdf(path, pages)
+                with open(path, "rb") as f:
+                    pdf = f.read()
+                document_id = hashlib.sha256(pdf).hexdigest()
+                for mode, extra in MODES.items():
+                    server.document_cache = DocumentCache(None)
+                    params = {"strategy": "recursive", "chunk_size": chunk_size, "overlap": overlap, **extra}
+                    for cache, files, ids in (("cold", {"file": pdf}, {}), ("warm", None, {"document_id": document_id})):
+                        first, total, received = request(client, {**params, **ids}, files)
+                        print(f"{pages:>6} {mode:<7} {cache:<5} {first:10.3f} {total:10.3f} {received / 1024:14.1f}")
+    uv.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    args = parser.parse_args()
+    main(args.pages, args.chunk_size, args.overlap)
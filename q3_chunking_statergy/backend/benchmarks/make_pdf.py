@@ -0,0 +1,84 @@
+"""Write synthetic multi-page text PDFs for benchmarks, without extra dependencies.
+
+Each page holds ``lines_per_page`` lines of random words in Helvetica, with a
+blank line between paragraphs, so every chunking strategy has sentences and
+paragraphs to split on.
+
+Usage (from ``backend/``):
+
+    python benchmarks/make_pdf.py sample.pdf --pages 500
+"""
+import argparse
+import random
+from typing import List
+
+WORDS = (
+    "retrieval augmented generation splits long documents into chunks that are embedded "
+    "indexed and searched by similarity before the most relevant passages are handed to "
+    "a language model which then answers the question using only that context while "
+    "chunk size overlap and boundaries decide how much meaning each passage keeps"
+).split()
+
+
+def page_lines(rng: random.Random, lines_per_page: int, words_per_line: int = 12) -> List[str]:
+    lines = []
+    for i in range(lines_per_page):
+        if i % 8 == 7:
+            lines.append("")  # Paragraph break.
+            continue
+        words = [rng.choice(WORDS) for _ in range(words_per_line)]
+        words[0] = words[0].capitalize()
+        lines.append(" ".join(words) + rng.choice(".!?."))
+    return lines
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 48, seed: int = 0) -> None:
+    """Write a ``pages``-page PDF of random text to ``path``."""
+    rng = random.Random(seed)
+    write_lines_pdf(path, [page_lines(rng, lines_per_page) for _ in range(pages)])
+
+
+def write_lines_pdf(path: str, pages: List[List[str]]) -> None:
+    """Write a PDF with one page per list of lines."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page object numbers are known.
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        body = "\n".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 40 800 Td\n{body}\nET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(pages)
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.writelines(b"%010d 00000 n \n" % offset for offset in offsets)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=48)
+    args = parser.parse_args()
+    write_pdf(args.path, args.pages, args.lines)
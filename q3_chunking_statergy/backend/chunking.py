@@ -1,45 +1,235 @@
-
 import re
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Split points for recursive chunking, strongest first.
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# When chunking a document that is still arriving, a chunk is final once the
+# text this far past its decision window has been received.
+SETTLE_MARGIN = 256
+
+Span = Tuple[int, int]
+
+
+class Chunk:
+    """A ``[start, end)`` span of a document; its text is sliced only when
+    serialised.
+
+    ``source`` may be a window of the document beginning at offset ``base``,
+    as when a document is chunked while its pages are still being extracted.
+    """
+
+    __slots__ = ("source", "start", "end", "base")
+
+    def __init__(self, source: str, start: int, end: int, base: int = 0):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.base = base
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start - self.base:self.end - self.base]
+
+    def to_dict(self) -> Dict:
+        return {"text": self.text, "start": self.start, "end": self.end, "size": self.size}
+
 
-def fixed_size_chunk(text: str, chunk_size: int = 500, overlap: int = 50) -> List[Dict]:
-    chunks = []
-    start = 0
+def _strip(text: str, start: int, end: int) -> Span:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _advance(text: str, start: int, end: int, overlap: int) -> int:
+    """Start of the chunk after ``[start, end)``: ``overlap`` characters back
+    from ``end`` (at most half the chunk, so chunking always moves forward),
+    moved to the next word boundary."""
+    if not overlap:
+        return end
+    resume = max(end - overlap, start + (end - start + 1) // 2)
+    if resume > 0 and not text[resume - 1].isspace():
+        space = text.find(" ", resume, end)
+        if space != -1:
+            resume = space + 1
+    return resume
+
+
+def _check_sizes(chunk_size: int, overlap: int) -> None:
+    if chunk_size < 1 or overlap < 0:
+        raise ValueError("chunk_size must be at least 1 and overlap at least 0")
+
+
+def fixed_spans(text: str, chunk_size: int = 500, overlap: int = 50, start: int = 0) -> Iterator[Span]:
+    """Every ``chunk_size - overlap`` characters, a span of ``chunk_size``."""
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
     while start < len(text):
-        end = min(start + chunk_size, len(text))
-        chunk = text[start:end]
-        chunks.append({"text": chunk, "start": start, "end": end, "size": len(chunk)})
+        yield start, min(start + chunk_size, len(text))
         start += chunk_size - overlap
-    return chunks
-
-
-def recursive_chunk(text: str, chunk_size: int = 500, overlap: int = 50) -> List[Dict]:
-    paragraphs = text.split("\n\n")
-    chunks, current = [], ""
-    for para in paragraphs:
-        if len(current) + len(para) < chunk_size:
-            current += para + "\n\n"
-        else:
-            chunks.append({"text": current.strip(), "size": len(current)})
-            current = para
-    if current:
-        chunks.append({"text": current.strip(), "size": len(current)})
-    return chunks
-
-def document_chunk(text: str) -> List[Dict]:
-    return [{"text": text.strip(), "size": len(text)}]
-
-def semantic_chunk(text: str, chunk_size: int = 500) -> List[str]:
-    sentences = re.split(r'(?<=[.!?]) +', text)
-    chunks, current = [], ""
-    for sentence in sentences:
-        if len(current) + len(sentence) < chunk_size:
-            current += sentence + " "
-        else:
-            chunks.append(current.strip())
-            current = sentence
-    if current:
-        chunks.append(current.strip())
-    return [{"text": chunk, "size": len(chunk)} for chunk in chunks]
-
-# RAG scenario based can be built on top of these with config logic
+
+
+def recursive_spans(text: str, chunk_size: int = 500, overlap: int = 50, start: int = 0) -> Iterator[Span]:
+    """Spans of at most ``chunk_size`` characters, cut at the strongest
+    separator (paragraph, line, sentence, word) in the second half of the
+    window, or hard-cut when there is none. Every span is non-empty, so
+    chunking always moves forward."""
+    _check_sizes(chunk_size, overlap)
+    n = len(text)
+    while True:
+        while start < n and text[start].isspace():
+            start += 1
+        if start >= n:
+            return
+        limit = start + chunk_size
+        end = n if limit >= n else limit
+        if limit < n:
+            for separator in SEPARATORS:
+                cut = text.rfind(separator, start + chunk_size // 2, limit)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        yield start, end
+        if end >= n:
+            return
+        start = _advance(text, start, end, overlap)
+
+
+def sentence_starts(text: str, start: int = 0) -> List[int]:
+    """Offsets where sentences begin (after the whitespace that separates
+    them), from ``start`` on, followed by ``len(text)``."""
+    while start < len(text) and text[start].isspace():
+        start += 1
+    n = len(text)
+    if start >= n:
+        return [n]
+    return [start] + [m.end() for m in SENTENCE_END.finditer(text, start) if m.end() < n] + [n]
+
+
+def sentence_spans(text: str, chunk_size: int = 500, overlap: int = 50, start: int = 0) -> Iterator[Span]:
+    """Whole sentences packed into spans of up to ``chunk_size`` characters (a
+    longer sentence is a span of its own); overlap repeats whole sentences."""
+    _check_sizes(chunk_size, overlap)
+    starts = sentence_starts(text, start)
+    i = 0
+    while i < len(starts) - 1:
+        j = max(bisect_right(starts, starts[i] + chunk_size) - 1, i + 1)
+        yield starts[i], starts[j]
+        if j == len(starts) - 1:
+            return
+        i = max(bisect_left(starts, starts[j] - overlap, i + 1, j), i + 1) if overlap else j
+
+
+def sentences(text: str) -> List[Span]:
+    """The non-empty sentences of ``text`` as spans, trimmed of whitespace."""
+    starts = sentence_starts(text)
+    spans = (_strip(text, a, b) for a, b in zip(starts, starts[1:]))
+    return [span for span in spans if span[0] < span[1]]
+
+
+def breakpoint_spans(
+    sentence_list: Sequence[Span], breaks: Sequence[bool], similarities: Sequence[float], chunk_size: int = 500, overlap: int = 0
+) -> Iterator[Span]:
+    """Group consecutive sentences into spans, starting a new span after
+    sentence ``k`` wherever ``breaks[k]`` is set.
+
+    A group that would grow past ``chunk_size`` characters is cut at its
+    lowest-similarity gap in the second half of the window instead (a
+    sentence longer than ``chunk_size`` is a span of its own). Only spans cut
+    for size overlap the next one, by whole trailing sentences up to
+    ``overlap`` characters; a breakpoint is never bridged.
+    """
+    m = len(sentence_list)
+    i = end = 0  # The next span starts at sentence i and must reach past sentence end - 1.
+    while i < m:
+        j = max(i + 1, end + 1)  # The span covers sentences i..j-1.
+        while j < m and not breaks[j - 1] and sentence_list[j][1] - sentence_list[i][0] <= chunk_size:
+            j += 1
+        cut_for_size = j < m and not breaks[j - 1]
+        if cut_for_size:
+            fill = sentence_list[i][0] + chunk_size // 2
+            gaps = [k for k in range(max(i, end), j) if sentence_list[k][1] >= fill]
+            if gaps:
+                j = 1 + min(gaps, key=lambda k: similarities[k])
+        yield sentence_list[i][0], sentence_list[j - 1][1]
+        if j >= m:
+            return
+        first, i, end = i, j, j
+        while cut_for_size and overlap and i - 1 > first and sentence_list[j - 1][1] - sentence_list[i - 1][0] <= overlap:
+            i -= 1
+
+
+def document_spans(text: str, chunk_size: int = 500, overlap: int = 50, start: int = 0) -> Iterator[Span]:
+    """The whole document as one span."""
+    yield start, len(text)
+
+
+# Strategies yield raw spans; all but fixed-size chunks are trimmed of
+# surrounding whitespace (and dropped if empty) when they become chunks.
+STRATEGIES: Dict[str, Callable[..., Iterator[Span]]] = {
+    "fixed": fixed_spans,
+    "recursive": recursive_spans,
+    "document": document_spans,
+    "sentence": sentence_spans,
+}
+
+
+def _chunks(strategy: str, text: str, chunk_size: int, overlap: int, base: int = 0) -> Iterator[Chunk]:
+    for start, end in STRATEGIES[strategy](text, chunk_size, overlap):
+        if strategy != "fixed":
+            start, end = _strip(text, start, end)
+        if start < end:
+            yield Chunk(text, base + start, base + end, base)
+
+
+def fixed_size_chunk(text: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[Chunk]:
+    return _chunks("fixed", text, chunk_size, overlap)
+
+
+def recursive_chunk(text: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[Chunk]:
+    return _chunks("recursive", text, chunk_size, overlap)
+
+
+def document_chunk(text: str) -> Iterator[Chunk]:
+    return _chunks("document", text, 0, 0)
+
+
+def sentence_chunk(text: str, chunk_size: int = 500, overlap: int = 0) -> Iterator[Chunk]:
+    return _chunks("sentence", text, chunk_size, overlap)
+
+
+def chunk_pages(pieces: Iterable[str], strategy: str, chunk_size: int = 500, overlap: int = 50) -> Iterator[Chunk]:
+    """Chunk a document that arrives in pieces (e.g. pages from
+    ``utils.join_pages``), yielding the same chunks as chunking the joined
+    text, as soon as each one is final.
+
+    Only the text from the first unfinished chunk on is kept, so memory stays
+    around one page plus one chunk whatever the document size.
+    """
+    spans = STRATEGIES.get(strategy)
+    if spans is None:
+        raise ValueError("Invalid strategy")
+    if strategy == "document":
+        yield from document_chunk("".join(pieces))
+        return
+    buffer, base, resume = "", 0, 0  # ``base`` is the document offset of ``buffer[0]``.
+    for piece in pieces:
+        buffer = buffer[resume - base:] + piece
+        base = resume
+        resume = base + len(buffer)
+        for start, end in spans(buffer, chunk_size, overlap):
+            if max(start + chunk_size, end) + SETTLE_MARGIN > len(buffer):
+                resume = base + start  # Decided by text that has not arrived yet.
+                break
+            if strategy != "fixed":
+                start, end = _strip(buffer, start, end)
+            if start < end:
+                yield Chunk(buffer, base + start, base + end, base)
+    yield from _chunks(strategy, buffer[resume - base:], chunk_size, overlap, resume)
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DOCUMENT_ID = re.compile(r"[0-9a-f]{64}")
+
+
+def file_digest(stream: BinaryIO, block_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a binary file, read in blocks; the stream is rewound."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """Extracted PDF text keyed by the SHA-256 of the PDF bytes, and chunk
+    results keyed by (document ID, strategy, parameters...).
+
+    Chunk results are kept as an (n, 2) array of ``(start, end)`` offsets into
+    the text rather than as text, so they are small. Both kinds of entry share
+    one in-memory LRU tier bounded by ``memory_budget_bytes``; with a
+    ``directory`` they are also written to disk, so evicted entries and
+    entries from before a restart are served without re-parsing the PDF.
+
+    The disk tier is bounded by ``disk_budget_bytes`` (``None`` for no
+    bound): once it is exceeded, the least recently used files are removed,
+    by modification time, which a disk hit refreshes. The memory tier is
+    locked, since it is used from the event loop and threadpool workers alike.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_budget_bytes: int = 256 * 2**20,
+        disk_budget_bytes: Optional[int] = None,
+    ):
+        self.directory = directory
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self._memory: "OrderedDict[tuple, object]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def _size(value) -> int:
+        return value.nbytes if isinstance(value, np.ndarray) else sys.getsizeof(value)
+
+    def _path(self, key: tuple) -> Optional[str]:
+        if not self.directory:
+            return None
+        if len(key) == 1:
+            return os.path.join(self.directory, f"{key[0]}.txt")
+        params = "-".join(str(part) for part in key[1:])
+        return os.path.join(self.directory, f"{key[0]}.{params}.npy")
+
+    def _disk_files(self) -> List[Tuple[float, int, str]]:
+        """``(mtime, size, path)`` of every cache file on disk."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith((".txt", ".npy")):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # Removed by another process.
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _trim_disk(self) -> None:
+        """Remove the least recently used files until the disk tier fits its budget."""
+        with self._disk_lock:
+            # Rescan: other processes may share the directory.
+            files = sorted(self._disk_files())
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.disk_budget_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    self.disk_evictions += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._disk_bytes = total
+
+    def _remember(self, key: tuple, value) -> None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = value
+            self._memory_bytes += self._size(value)
+            while self._memory_bytes > self.memory_budget_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= self._size(evicted)
+                self.evictions += 1
+
+    def _get(self, key: tuple):
+        if not DOCUMENT_ID.fullmatch(key[0]):
+            return None
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+        path = self._path(key)
+        if path is not None:
+            try:
+                if len(key) == 1:
+                    with open(path, encoding="utf-8") as f:
+                        value = f.read()
+                else:
+                    value = np.load(path)
+            except FileNotFoundError:
+                value = None
+            if value is not None:
+                try:
+                    os.utime(path)  # Most recently used, for the disk budget.
+                except OSError:
+                    pass
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _put(self, key: tuple, value) -> None:
+        self._remember(key, value)
+        path = self._path(key)
+        if path is not None and not os.path.exists(path):
+            # Write then rename, so a concurrent reader never sees a partial file.
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if len(key) == 1:
+                with open(temporary, "w", encoding="utf-8") as f:
+                    f.write(value)
+            else:
+                with open(temporary, "wb") as f:
+                    np.save(f, value)
+            size = os.path.getsize(temporary)
+            os.replace(temporary, path)
+            with self._disk_lock:
+                self._disk_bytes += size
+            if self.disk_budget_bytes is not None and self._disk_bytes > self.disk_budget_bytes:
+                self._trim_disk()
+
+    def get_text(self, document_id: str) -> Optional[str]:
+        return self._get((document_id,))
+
+    def put_text(self, document_id: str, text: str) -> None:
+        self._put((document_id,), text)
+
+    def get_spans(self, key: Tuple) -> Optional[np.ndarray]:
+        """``key`` is ``(document_id, strategy, *parameters)``."""
+        return self._get(tuple(key))
+
+    def put_spans(self, key: Tuple, spans) -> None:
+        self._put(tuple(key), np.asarray(spans, dtype=np.int64).reshape(-1, 2))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "evictions": self.evictions,
+                "disk_bytes": self._disk_bytes,
+                "disk_budget_bytes": self.disk_budget_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
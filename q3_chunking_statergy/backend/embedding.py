@@ -1,15 +1,18 @@
-import httpx
+"""The Ollama embedding client, shared with the plagiarism detector
+(``ollama_embeddings/client.py`` at the repository root)."""
+import os
+import sys
 from typing import List
 
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from ollama_embeddings.client import EMBED_MODEL, OLLAMA_URL, RETRY_STATUSES, EmbeddingClient  # noqa: E402,F401
+
+# Shared client for the app's lifetime; main.py opens and closes it.
+embedding_client = EmbeddingClient()
+
+
 async def get_embeddings(texts: List[str]) -> List[List[float]]:
-    embeddings = []
-    async with httpx.AsyncClient() as client:
-        for text in texts:
-            response = await client.post(
-                "http://localhost:11434/api/embeddings",
-                json={"model": "nomic-embed-text", "prompt": text}
-            )
-            response.raise_for_status()
-            data = response.json()
-            embeddings.append(data["embedding"])
-    return embeddings
+    return await embedding_client.embed(texts)
@@ -0,0 +1,10 @@
+"""The content-hash embedding cache, shared with the plagiarism detector
+(``ollama_embeddings/cache.py`` at the repository root)."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from ollama_embeddings.cache import DIGEST_SIZE, EmbeddingCache, VectorStore, text_digest  # noqa: E402,F401
@@ -1,11 +1,188 @@
 
-from fastapi import FastAPI, File, UploadFile
+import asyncio
+import json
+import os
+import re
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import httpx
+import numpy as np
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from utils import extract_text_from_pdf
-from chunking import fixed_size_chunk, recursive_chunk, document_chunk, semantic_chunk
+from utils import PDF_WORKERS, extract_pages, join_pages, shutdown_pdf_pool
+from chunking import STRATEGIES, Chunk, chunk_pages
+from document_cache import DocumentCache, file_digest
+from embedding import embedding_client
+from embedding_cache import EmbeddingCache
+from semantic import DEFAULT_PERCENTILE, semantic_chunk
+from vector_store import ChunkStore
 
+# Sentence embeddings by content hash, so re-chunking a document with other
+# parameters does not re-embed it.
+embedding_cache = EmbeddingCache(
+    os.getenv("EMBED_CACHE_DIR", "embedding_cache") or None,
+    memory_budget_bytes=int(os.getenv("EMBED_CACHE_MEMORY_MB", "256")) * 2**20,
+    readonly=os.getenv("EMBED_CACHE_READONLY", "") == "1",
+)
+
+# Extracted text by SHA-256 of the PDF, and chunk offsets by (document,
+# strategy, parameters), so moving a slider neither re-uploads nor re-parses.
+document_cache = DocumentCache(
+    os.getenv("DOC_CACHE_DIR") or None,
+    memory_budget_bytes=int(os.getenv("DOC_CACHE_MEMORY_MB", "256")) * 2**20,
+    disk_budget_bytes=int(os.getenv("DOC_CACHE_DISK_MB", "2048")) * 2**20 or None,
+)
+
+# Retrieval indexes, one ChunkStore per name under RAG_INDEX_DIR. The LSH
+# shape applies to new indexes: fewer bits per table find less similar
+# neighbours, at the cost of more candidates per query.
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "rag_index")
+RAG_LSH_TABLES = int(os.getenv("RAG_LSH_TABLES", "32"))
+RAG_LSH_BITS = int(os.getenv("RAG_LSH_BITS", "8"))
+INDEX_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+chunk_stores: Dict[str, ChunkStore] = {}
+
+
+def get_chunk_store(name: str) -> ChunkStore:
+    if not INDEX_NAME.fullmatch(name):
+        raise HTTPException(status_code=400, detail="Index names are 1-64 letters, digits, '-' or '_'")
+    store = chunk_stores.get(name)
+    if store is None:
+        store = chunk_stores[name] = ChunkStore(os.path.join(RAG_INDEX_DIR, name), RAG_LSH_TABLES, RAG_LSH_BITS)
+    return store
+
+
+def error_response(e: Exception) -> Dict:
+    """The ``{"error": ...}`` response for invalid chunking parameters or an
+    embedding model that cannot be reached."""
+    if isinstance(e, httpx.HTTPError):
+        return {"error": f"Embedding model at {embedding_client.base_url} failed: {e!r}"}
+    return {"error": str(e)}
+
+
+def extracted_pieces(document_id: str, stream: BinaryIO, parallel: Optional[bool] = None) -> Iterator[str]:
+    """Yield the text of a PDF page by page, caching the whole text once
+    extraction finishes."""
+    pieces = []
+    for piece in join_pages(extract_pages(stream, parallel=parallel)):
+        pieces.append(piece)
+        yield piece
+    document_cache.put_text(document_id, "".join(pieces))
+
+
+def recorded(key: Tuple, chunks: Iterable[Chunk]) -> Iterator[Chunk]:
+    """Pass chunks through, caching their offsets once all have been produced."""
+    spans = []
+    for chunk in chunks:
+        spans.append((chunk.start, chunk.end))
+        yield chunk
+    document_cache.put_spans(key, spans)
+
+
+def chunk_stats(sizes: Sequence[int], bins: int = 10) -> Dict:
+    """Size summary and histogram of a document's chunks."""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if not len(sizes):
+        return {"min_size": 0, "max_size": 0, "mean_size": 0, "histogram": {"edges": [], "counts": []}}
+    counts, edges = np.histogram(sizes, bins=bins)
+    return {
+        "min_size": int(sizes.min()),
+        "max_size": int(sizes.max()),
+        "mean_size": round(float(sizes.mean()), 1),
+        "histogram": {"edges": [round(float(edge), 1) for edge in edges], "counts": counts.tolist()},
+    }
+
+
+# Chunks per write when streaming; the first chunk is always sent on its own
+# so it reaches the client as soon as it exists.
+STREAM_BATCH = 256
+
+
+def ndjson_chunks(document_id: str, chunks: Iterable[Chunk], offset: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+    """One JSON object per line for each chunk from ``offset`` (``limit`` of
+    them, if given), then a summary line with the total and size statistics
+    of all chunks (or an ``error`` line)."""
+    stop = None if limit is None else offset + limit
+    lines, sizes = [], []
+    try:
+        for index, chunk in enumerate(chunks):
+            sizes.append(chunk.size)
+            if index < offset or (stop is not None and index >= stop):
+                continue
+            lines.append(json.dumps({"index": index, **chunk.to_dict()}))
+            if index == offset or len(lines) >= STREAM_BATCH:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        lines.append(json.dumps({"document_id": document_id, "total_chunks": len(sizes), "stats": chunk_stats(sizes)}))
+    except ValueError as e:
+        lines.append(json.dumps({"error": str(e)}))
+    yield "\n".join(lines) + "\n"
 
-app = FastAPI()
+
+async def document_chunks(
+    document_id: str,
+    text: Optional[str],
+    stream: Optional[BinaryIO],
+    strategy: str,
+    chunk_size: int,
+    overlap: int,
+    percentile: float = DEFAULT_PERCENTILE,
+    threshold: Optional[float] = None,
+    parallel: Optional[bool] = None,
+) -> Iterable[Chunk]:
+    """The chunks of a document, from the chunk cache when possible.
+
+    ``text`` is the cached text, if any; otherwise the PDF is extracted from
+    ``stream``. Except for semantic chunks, which need the whole text first,
+    the result is lazy: iterate it off the event loop.
+    """
+    key = (document_id, strategy, chunk_size, overlap)
+    if strategy == "semantic":
+        key += (percentile, threshold)
+    spans = document_cache.get_spans(key) if text is not None else None
+    if spans is not None:
+        return (Chunk(text, start, end) for start, end in spans.tolist())
+    if strategy == "semantic":
+        if text is None:
+            text = await run_in_threadpool(lambda: "".join(extracted_pieces(document_id, stream, parallel)))
+        semantic = await semantic_chunk(text, embedding_client, embedding_cache, chunk_size, overlap, percentile, threshold)
+        return recorded(key, semantic)
+    # Pages are extracted lazily (large PDFs in the process pool) and chunked
+    # as they arrive.
+    pieces = [text] if text is not None else extracted_pieces(document_id, stream, parallel)
+    return recorded(key, chunk_pages(pieces, strategy, chunk_size, overlap))
+
+
+async def ingest_document(
+    store: ChunkStore, document_id: str, name: Optional[str], stream: Optional[BinaryIO], params: Dict, parallel: Optional[bool] = None
+) -> Tuple[Dict, bool]:
+    """Extract, chunk and embed one document into ``store``, unless it is already there."""
+    existing = store.get_document(document_id)
+    if existing is not None:
+        return existing, False
+    text = document_cache.get_text(document_id)
+    if text is None and stream is None:
+        raise HTTPException(status_code=404, detail=f"Unknown document_id {document_id}; upload the PDF again")
+    chunks = await document_chunks(document_id, text, stream, parallel=parallel, **params)
+    chunks = await run_in_threadpool(list, chunks)
+    texts = [chunk.text for chunk in chunks]
+    # Batched through the embedding client; chunks seen before come from the cache.
+    embeddings = await embedding_cache.embed(embedding_client, texts)
+    spans = [(chunk.start, chunk.end) for chunk in chunks]
+    return await run_in_threadpool(store.add, document_id, name or document_id, params, spans, texts, embeddings)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await embedding_client.start()
+    yield
+    await embedding_client.close()
+    shutdown_pdf_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -14,20 +191,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.post("/documents/")
+async def upload_document(file: UploadFile = File(...)):
+    """Upload a PDF once; chunk it afterwards with ``/upload/?document_id=...``.
+    The ID is the SHA-256 of the PDF, so clients can also compute it locally."""
+    document_id = await run_in_threadpool(file_digest, file.file)
+    text = document_cache.get_text(document_id)
+    if text is None:
+        text = await run_in_threadpool(lambda: "".join(extracted_pieces(document_id, file.file)))
+    return {"document_id": document_id, "chars": len(text)}
+
 @app.post("/upload/")
-async def upload_pdf(file: UploadFile = File(...), strategy: str = "fixed", chunk_size: int = 500, overlap: int = 50):
-    content = await file.read()
-    text = extract_text_from_pdf(content)
-
-    if strategy == "fixed":
-        chunks = fixed_size_chunk(text, chunk_size, overlap)
-    elif strategy == "recursive":
-        chunks = recursive_chunk(text, chunk_size, overlap)
-    elif strategy == "document":
-        chunks = document_chunk(text)
-    elif strategy == "semantic":
-        chunks = semantic_chunk(text, chunk_size)
-    else:
+async def upload_pdf(
+    file: Optional[UploadFile] = File(None),
+    document_id: Optional[str] = None,
+    strategy: str = "fixed",
+    chunk_size: int = Query(500, ge=1),
+    overlap: int = Query(50, ge=0),
+    percentile: float = Query(DEFAULT_PERCENTILE, ge=0, le=100),
+    threshold: Optional[float] = None,
+    stream: bool = False,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Chunk a PDF sent as ``file`` or referenced by ``document_id`` (from
+    ``/documents/`` or an earlier upload; 404 once it has left the cache).
+
+    For ``semantic`` chunks, ``threshold`` (cosine similarity between adjacent
+    sentences) or else ``percentile`` (of sentence gap distances) sets where
+    topics are considered to shift.
+
+    Responses come in three forms: every chunk at once (the default), one
+    page of ``limit`` chunks from ``offset`` with size statistics, or with
+    ``stream`` an NDJSON stream written as chunks are produced (only those
+    ``offset`` and ``limit`` select, if given; the summary counts them all).
+    """
+    if strategy != "semantic" and strategy not in STRATEGIES:
+        return {"error": "Invalid strategy"}
+    if file is not None:
+        document_id = await run_in_threadpool(file_digest, file.file)
+    elif document_id is None:
+        raise HTTPException(status_code=400, detail="Send a PDF file or a document_id")
+    text = document_cache.get_text(document_id)
+    if text is None and file is None:
+        raise HTTPException(status_code=404, detail="Unknown document_id; upload the PDF again")
+
+    # Semantic chunks are computed here, and need the embedding model; the
+    # others are produced lazily below.
+    try:
+        chunks = await document_chunks(
+            document_id, text, file.file if file else None, strategy, chunk_size, overlap, percentile, threshold
+        )
+        if stream:
+            return StreamingResponse(ndjson_chunks(document_id, chunks, offset, limit), media_type="application/x-ndjson")
+        chunks = await run_in_threadpool(list, chunks)
+    except (ValueError, httpx.HTTPError) as e:
+        return error_response(e)
+    if limit is None:
+        chunks = await run_in_threadpool(lambda: [chunk.to_dict() for chunk in chunks])
+        return {"document_id": document_id, "chunks": chunks, "total_chunks": len(chunks)}
+    return {
+        "document_id": document_id,
+        "chunks": [chunk.to_dict() for chunk in chunks[offset:offset + limit]],
+        "total_chunks": len(chunks),
+        "offset": offset,
+        "limit": limit,
+        "stats": chunk_stats([chunk.size for chunk in chunks]),
+    }
+
+@app.post("/rag/ingest")
+async def rag_ingest(
+    files: Optional[List[UploadFile]] = File(None),
+    document_ids: Optional[List[str]] = Query(None),
+    index: str = "default",
+    strategy: str = "recursive",
+    chunk_size: int = Query(500, ge=1),
+    overlap: int = Query(50, ge=0),
+    percentile: float = Query(DEFAULT_PERCENTILE, ge=0, le=100),
+    threshold: Optional[float] = None,
+):
+    """Chunk, embed and store PDFs (``files`` and/or cached ``document_ids``)
+    in the retrieval index ``index``. Documents are ingested concurrently;
+    ones already in the index are skipped, and keep the chunks they were
+    stored with (each result lists its ``params``, with a ``warning`` when
+    they differ from the request's).
+    """
+    if strategy != "semantic" and strategy not in STRATEGIES:
         return {"error": "Invalid strategy"}
-    
-    return {"chunks": chunks, "total_chunks": len(chunks)}
+    store = get_chunk_store(index)
+    params = {"strategy": strategy, "chunk_size": chunk_size, "overlap": overlap}
+    if strategy == "semantic":
+        params.update(percentile=percentile, threshold=threshold)
+    sources = [(None, document_id, None) for document_id in document_ids or []]
+    for file in files or []:
+        sources.append((file.filename, await run_in_threadpool(file_digest, file.file), file.file))
+    if not sources:
+        raise HTTPException(status_code=400, detail="Send PDF files or document_ids")
+    # With several documents, extract each in the process pool so their
+    # parsing runs in parallel instead of taking turns on the GIL.
+    parallel = True if len(sources) > 1 and PDF_WORKERS > 1 else None
+    try:
+        results = await asyncio.gather(
+            *(ingest_document(store, document_id, name, stream, params, parallel) for name, document_id, stream in sources)
+        )
+    except (ValueError, httpx.HTTPError) as e:
+        return error_response(e)
+    documents = []
+    for entry, added in results:
+        stored = ChunkStore.document_params(entry)
+        document = {
+            "document_id": entry["document_id"],
+            "name": entry["name"],
+            "chunks": entry["rows"][1] - entry["rows"][0],
+            "added": added,
+            "params": stored,
+        }
+        if not added and stored != params:
+            document["warning"] = "Already indexed with other chunking parameters; kept the existing chunks"
+        documents.append(document)
+    return {"index": index, "documents": documents, "total_chunks": len(store)}
+
+@app.post("/rag/query")
+async def rag_query(question: str, index: str = "default", k: int = Query(5, ge=1, le=100), ann: bool = False):
+    """The ``k`` chunks of ``index`` closest to ``question`` by cosine
+    similarity: exact over every chunk, or with ``ann`` over LSH candidates."""
+    store = get_chunk_store(index)
+    if not len(store):
+        raise HTTPException(status_code=404, detail="Index is empty; ingest documents first")
+    try:
+        embedding = (await embedding_cache.embed(embedding_client, [question]))[0]
+    except httpx.HTTPError as e:
+        return error_response(e)
+    results = await run_in_threadpool(store.search, embedding, k, ann)
+    return {"index": index, "results": results}
+
+@app.get("/rag/indexes")
+async def rag_indexes():
+    names = sorted(os.listdir(RAG_INDEX_DIR)) if os.path.isdir(RAG_INDEX_DIR) else []
+    return {name: get_chunk_store(name).stats() for name in names if INDEX_NAME.fullmatch(name)}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {"embeddings": embedding_cache.stats(), "documents": document_cache.stats()}
@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+import numpy as np
+
+from chunking import Chunk, breakpoint_spans, sentences
+
+# Default breakpoint: gaps whose cosine distance is above this percentile of
+# all gaps in the document, i.e. the sharpest 5% of topic shifts.
+DEFAULT_PERCENTILE = 95.0
+
+
+def adjacent_similarities(embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity between each sentence embedding and the next."""
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    return np.einsum("ij,ij->i", unit[:-1], unit[1:])
+
+
+def find_breaks(similarities: np.ndarray, percentile: float = DEFAULT_PERCENTILE, threshold: Optional[float] = None) -> np.ndarray:
+    """Mark the gaps to break at: similarity below ``threshold`` if given,
+    otherwise distance above the ``percentile``-th percentile of all gaps."""
+    if threshold is not None:
+        return similarities < threshold
+    if not len(similarities):
+        return np.zeros(0, dtype=bool)
+    distances = 1 - similarities
+    return distances > np.percentile(distances, percentile)
+
+
+async def semantic_chunk(
+    text: str,
+    client,
+    cache,
+    chunk_size: int = 500,
+    overlap: int = 0,
+    percentile: float = DEFAULT_PERCENTILE,
+    threshold: Optional[float] = None,
+) -> List[Chunk]:
+    """Split ``text`` into sentences, embed them (batched through ``client``,
+    each distinct sentence once via ``cache``) and break chunks where the
+    similarity between adjacent sentences drops, within ``chunk_size``.
+
+    Sentence vectors are cached by content hash, so re-chunking the same
+    document with another size or threshold does not call the model again.
+    """
+    spans = sentences(text)
+    if not spans:
+        return []
+    embeddings = await cache.embed(client, [text[start:end] for start, end in spans])
+    similarities = adjacent_similarities(embeddings)
+    breaks = find_breaks(similarities, percentile, threshold)
+    return [
+        Chunk(text, start, end)
+        for start, end in breakpoint_spans(spans, breaks.tolist(), similarities.tolist(), chunk_size, overlap)
+    ]
@@ -1,8 +1,92 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 
 from PyPDF2 import PdfReader
-from io import BytesIO
+
+# PDFs with at least this many pages are extracted in a process pool, in
+# ranges of PAGES_PER_TASK pages; smaller ones are read in-process.
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PAGES_PER_TASK = 16
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Per worker process: the reader for the file it last parsed, so a worker
+# handling several ranges of one PDF parses its cross-reference table once.
+_worker_reader: Dict[str, PdfReader] = {}
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _extract_range(path: str, start: int, stop: int) -> List[str]:
+    reader = _worker_reader.get(path)
+    if reader is None:
+        _worker_reader.clear()
+        reader = _worker_reader[path] = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def extract_pages(source: Union[str, bytes, BinaryIO], parallel: Optional[bool] = None) -> Iterator[str]:
+    """Yield the text of each page of a PDF, in order, as it is extracted.
+
+    ``source`` is a path, the PDF bytes or a seekable binary file (such as an
+    upload's spooled file, which is read in place rather than copied into
+    memory). Large PDFs are spread over the process pool in page ranges when
+    ``parallel`` is true or, by default, when they have at least
+    ``PARALLEL_MIN_PAGES`` pages; pages are still yielded in order, as soon as
+    their range is done. Each page's ``extract_text()`` runs once.
+    """
+    stream = BytesIO(source) if isinstance(source, bytes) else source
+    reader = PdfReader(stream)
+    total = len(reader.pages)
+    if parallel is None:
+        parallel = total >= PARALLEL_MIN_PAGES and PDF_WORKERS > 1
+    if not parallel:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    path, temporary = source, None
+    if not isinstance(source, str):
+        # Workers open the PDF by path; spool the stream to disk without reading it all into memory.
+        stream.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            shutil.copyfileobj(stream, f)
+        path = temporary = f.name
+    try:
+        ranges: List[Tuple[int, int]] = [(i, min(i + PAGES_PER_TASK, total)) for i in range(0, total, PAGES_PER_TASK)]
+        pool = get_pdf_pool()
+        for pages in pool.map(_extract_range, [path] * len(ranges), *zip(*ranges)):
+            yield from pages
+    finally:
+        if temporary is not None:
+            os.unlink(temporary)
+
+
+def join_pages(pages: Iterator[str]) -> Iterator[str]:
+    """Yield the pieces of the document text: non-empty pages separated by newlines."""
+    first = True
+    for text in pages:
+        if not text:
+            continue
+        yield text if first else "\n" + text
+        first = False
+
 
 def extract_text_from_pdf(file) -> str:
-    pdf_stream = BytesIO(file)
-    reader = PdfReader(pdf_stream)
-    return "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
+    return "".join(join_pages(extract_pages(file)))
@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: adds are not coordinated across processes.
+    fcntl = None
+
+# Columns of rows.i64: document number, chunk start and end in the document
+# text, and the chunk text's byte range in texts.bin.
+ROW_FIELDS = 5
+
+
+def _unit(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class ChunkStore:
+    """Chunk embeddings and metadata for retrieval, memory-mapped from disk.
+
+    ``directory`` holds ``vectors.f32`` (unit vectors, one row per chunk),
+    ``rows.i64`` (per chunk: document number, ``start``, ``end`` and the byte
+    range of its text), ``texts.bin`` (chunk texts, UTF-8), ``documents.jsonl``
+    (one line per document with its ID, name, chunking parameters and row
+    range) and ``meta.json``. All are append-only; a document's line is
+    written last, so rows from an interrupted add are ignored and overwritten.
+    Adds take an exclusive lock on the ``lock`` file, so several worker
+    processes can share a store; each picks up the others' documents with
+    ``refresh()``, which ``add`` and ``search`` call.
+
+    Queries score every chunk with one matrix-vector product, or with
+    ``ann`` only the candidates from random-projection LSH: chunks whose
+    ``num_bits`` projection signs match the query's in any of ``num_tables``
+    tables. Signatures are kept as one small-integer array, compared with the
+    query's in a single vectorised scan, and rebuilt when the store is opened.
+    """
+
+    def __init__(self, directory: str, num_tables: int = 32, num_bits: int = 10, seed: int = 0):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.rows_path = os.path.join(directory, "rows.i64")
+        self.texts_path = os.path.join(directory, "texts.bin")
+        self.documents_path = os.path.join(directory, "documents.jsonl")
+        self.lock_path = os.path.join(directory, "lock")
+        self.dim: Optional[int] = None
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.seed = seed
+        self.documents: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+        self._size = 0
+        self._documents_bytes = 0  # How much of documents.jsonl has been read.
+        self._planes: Optional[np.ndarray] = None
+        self._keys = np.zeros((0, self.num_tables), dtype=np.min_scalar_type(2**self.num_bits - 1))
+        self._vectors: Optional[np.ndarray] = None
+        self._rows: Optional[np.ndarray] = None
+        self._texts: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _read_meta(self) -> None:
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        self.dim, self.num_tables, self.num_bits, self.seed = (
+            meta["dim"], meta["num_tables"], meta["num_bits"], meta["seed"]
+        )
+        self._planes = None
+        self._keys = np.zeros((0, self.num_tables), dtype=np.min_scalar_type(2**self.num_bits - 1))
+
+    def refresh(self) -> None:
+        """Pick up documents added since the last refresh (possibly by another process)."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        if self.dim is None and os.path.exists(self.meta_path):
+            self._read_meta()
+        try:
+            if os.path.getsize(self.documents_path) <= self._documents_bytes:
+                return
+        except FileNotFoundError:
+            return
+        with open(self.documents_path, "rb") as f:
+            f.seek(self._documents_bytes)
+            tail = f.read()
+        # Only whole lines: a writer may be part-way through the last one.
+        tail = tail[:tail.rfind(b"\n") + 1]
+        self._documents_bytes += len(tail)
+        documents = [json.loads(line) for line in tail.splitlines()]
+        for document in documents:
+            self._add_document(document)
+        size = documents[-1]["rows"][1] if documents else self._size
+        if size > self._size:  # meta.json, and so dim, is written before any rows.
+            new = np.memmap(self.vectors_path, dtype=np.float32, mode="r", offset=self._size * self.dim * 4, shape=(size - self._size, self.dim))
+            self._keys = np.concatenate((self._keys, self._signatures(new)))
+            self._size = size
+            self._map()
+
+    def _add_document(self, document: Dict) -> None:
+        self.documents.append(document)
+        self._by_id[document["document_id"]] = document
+
+    def _map(self) -> None:
+        rows = np.memmap(self.rows_path, dtype=np.int64, mode="r", shape=(self._size, ROW_FIELDS))
+        text_bytes = int(rows[-1, 4])
+        # mmap cannot map an empty file.
+        self._texts = np.memmap(self.texts_path, dtype=np.uint8, mode="r", shape=(text_bytes,)) if text_bytes else np.zeros(0, np.uint8)
+        self._rows = rows
+        # Vectors last: a concurrent search sizes itself by them.
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._size, self.dim))
+
+    def _init_planes(self) -> np.ndarray:
+        if self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.dim, self.num_tables * self.num_bits)).astype(np.float32)
+        return self._planes
+
+    def _signatures(self, unit: np.ndarray) -> np.ndarray:
+        """Return an (n, num_tables) array of bucket keys."""
+        bits = (np.asarray(unit) @ self._init_planes()) > 0
+        bits = bits.reshape(len(bits), self.num_tables, self.num_bits)
+        return (bits @ (1 << np.arange(self.num_bits, dtype=np.int64))).astype(self._keys.dtype)
+
+    def get_document(self, document_id: str) -> Optional[Dict]:
+        return self._by_id.get(document_id)
+
+    @staticmethod
+    def document_params(document: Dict) -> Dict:
+        """The chunking parameters a document was stored with."""
+        return {key: value for key, value in document.items() if key not in ("document_id", "name", "rows")}
+
+    def add(self, document_id: str, name: str, params: Dict, spans: Sequence[Tuple[int, int]], texts: Sequence[str], embeddings) -> Tuple[Dict, bool]:
+        """Store a document's chunks (``spans`` into its text, their ``texts``
+        and embeddings). A document already in the store is left as it is.
+
+        Returns the document's entry and whether it was added.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return self._add(document_id, name, params, spans, texts, embeddings)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _add(self, document_id: str, name: str, params: Dict, spans: Sequence[Tuple[int, int]], texts: Sequence[str], embeddings) -> Tuple[Dict, bool]:
+        self._refresh()
+        existing = self._by_id.get(document_id)
+        if existing is not None:
+            return existing, False
+        unit = _unit(embeddings) if len(texts) else np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self.dim is not None and len(unit) and unit.shape[1] != self.dim:
+            raise ValueError(f"Embeddings have {unit.shape[1]} dimensions; this index stores {self.dim}")
+        if self.dim is None and len(unit):
+            self.dim = unit.shape[1]
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim, "num_tables": self.num_tables, "num_bits": self.num_bits, "seed": self.seed}, f)
+
+        first_row = self._size
+        text_base = int(self._rows[-1, 4]) if first_row else 0
+        encoded = [text.encode("utf-8") for text in texts]
+        text_ends = text_base + np.cumsum([len(data) for data in encoded], dtype=np.int64)
+        rows = np.empty((len(texts), ROW_FIELDS), dtype=np.int64)
+        rows[:, 0] = len(self.documents)
+        rows[:, 1:3] = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+        rows[:, 3] = np.concatenate(([text_base], text_ends[:-1])) if len(texts) else []
+        rows[:, 4] = text_ends
+
+        document = {
+            "document_id": document_id,
+            "name": name,
+            **params,
+            "rows": [first_row, first_row + len(texts)],
+        }
+        if len(texts):
+            # Truncate first: rows past the last committed document are
+            # left over from an interrupted add.
+            for path, offset, data in (
+                (self.texts_path, text_base, b"".join(encoded)),
+                (self.vectors_path, first_row * self.dim * 4, np.ascontiguousarray(unit).tobytes()),
+                (self.rows_path, first_row * ROW_FIELDS * 8, rows.tobytes()),
+            ):
+                with open(path, "ab") as f:
+                    f.truncate(offset)
+                    f.write(data)
+        with open(self.documents_path, "a") as f:
+            f.write(json.dumps(document) + "\n")
+        self._refresh()
+        return document, True
+
+    def _chunk(self, row: int, score: float) -> Dict:
+        number, start, end, text_start, text_end = self._rows[row].tolist()
+        document = self.documents[number]
+        return {
+            "document_id": document["document_id"],
+            "name": document["name"],
+            "start": start,
+            "end": end,
+            "text": self._texts[text_start:text_end].tobytes().decode("utf-8"),
+            "score": score,
+        }
+
+    def search(self, embedding, k: int = 5, ann: bool = False) -> List[Dict]:
+        """The ``k`` chunks most similar to ``embedding`` (cosine, as the dot
+        product of unit vectors), best first."""
+        # Skip the refresh while an add holds the lock; it refreshes when done.
+        if self._lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+        vectors = self._vectors
+        if vectors is None:
+            return []
+        query = _unit(embedding)[0]
+        if ann:
+            # Sized by ``vectors``: ignore rows added after this search began.
+            keys = self._keys[:len(vectors)]
+            rows = np.flatnonzero((keys == self._signatures(query[None, :])).any(axis=1))
+            scores = vectors[rows] @ query
+        else:
+            scores = vectors @ query
+            rows = np.arange(len(scores))
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top])]
+        return [self._chunk(int(rows[i]), float(scores[i])) for i in top]
+
+    def stats(self) -> Dict[str, object]:
+        return {"documents": len(self.documents), "chunks": self._size, "dim": self.dim}
@@ -1,22 +1,119 @@
 # frontend/app.py
+import hashlib
+import json
+
 import streamlit as st
 import requests
 
+API_URL = "http://localhost:8000"
+# Chunks shown per page; later pages are fetched on demand.
+PAGE_SIZE = 20
+
 st.title("🔗 RAG Chunking Strategy Visualizer")
 
 uploaded_file = st.file_uploader("Upload a PDF", type="pdf")
-strategy = st.selectbox("Select Chunking Strategy", ["fixed", "recursive", "document", "semantic"])
+strategy = st.selectbox("Select Chunking Strategy", ["fixed", "recursive", "document", "sentence", "semantic"])
 chunk_size = st.slider("Chunk Size", 100, 1500, 500)
 overlap = st.slider("Overlap", 0, 300, 50)
+# Semantic chunks break where adjacent sentences are least similar; sentence
+# embeddings are cached server-side, so moving this slider does not re-embed.
+percentile = st.slider("Breakpoint Percentile", 50, 99, 95) if strategy == "semantic" else 95
+
+
+def upload_document(pdf_bytes):
+    """Send the PDF once; the backend keeps its text under the returned ID."""
+    response = requests.post(f"{API_URL}/documents/", files={"file": pdf_bytes})
+    response.raise_for_status()
+    st.session_state["uploaded_id"] = response.json()["document_id"]
+
+
+def post_chunks(pdf_bytes, params, **kwargs):
+    response = requests.post(f"{API_URL}/upload/", params=params, **kwargs)
+    if response.status_code == 404:  # Evicted or the backend restarted.
+        upload_document(pdf_bytes)
+        response = requests.post(f"{API_URL}/upload/", params=params, **kwargs)
+    return response
+
+
+def show_chunk(index, chunk):
+    st.markdown(f"### Chunk {index + 1} ({chunk['size']} chars)")
+    st.code(chunk["text"])
+
+
+def show_stats(stats):
+    st.caption(f"Chunk sizes: min {stats['min_size']}, mean {stats['mean_size']}, max {stats['max_size']} chars")
+    histogram = stats["histogram"]
+    if histogram["counts"]:
+        labels = [f"{lo:.0f}-{hi:.0f}" for lo, hi in zip(histogram["edges"], histogram["edges"][1:])]
+        st.bar_chart(dict(zip(labels, histogram["counts"])))
+
 
 if uploaded_file:
-    with st.spinner("Uploading and chunking..."):
-        files = {"file": uploaded_file.getvalue()}
-        params = {"strategy": strategy, "chunk_size": chunk_size, "overlap": overlap}
-        response = requests.post("http://localhost:8000/upload/", files=files, params=params)
-        result = response.json()
+    pdf_bytes = uploaded_file.getvalue()
+    # The document ID is the SHA-256 of the PDF, so slider changes only
+    # send the ID, never the file again.
+    document_id = hashlib.sha256(pdf_bytes).hexdigest()
+    if st.session_state.get("uploaded_id") != document_id:
+        with st.spinner("Uploading..."):
+            upload_document(pdf_bytes)
+    params = {
+        "document_id": document_id,
+        "strategy": strategy,
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "percentile": percentile,
+    }
+    # Totals from the first pass, so the page selector knows its range.
+    known = st.session_state.get("totals", {}).get(str(params))
+    selector = st.empty()
+
+    def select_page(total):
+        # Keyed by the settings, so the chosen page survives reruns but not
+        # a settings change.
+        return selector.number_input("Page", 1, (total + PAGE_SIZE - 1) // PAGE_SIZE, 1, key=f"page-{params}")
+
+    if known is None:
+        # First pass: stream the first page so it renders as chunks arrive.
+        # Later chunks are counted server-side; only the summary line says
+        # how many there are.
+        status = st.empty()
+        status.info("Chunking...")
+        summary = st.container()
+        response = post_chunks(pdf_bytes, {**params, "stream": True, "offset": 0, "limit": PAGE_SIZE}, stream=True)
+        if response.status_code != 200:
+            st.error(f"Chunking failed ({response.status_code}): {response.text}")
+            st.stop()
+        result = None
+        for line in response.iter_lines():
+            if not line:
+                continue
+            item = json.loads(line)
+            if "error" in item:
+                st.error(item["error"])
+                st.stop()
+            if "index" in item:
+                show_chunk(item["index"], item)
+            else:
+                result = item
+        status.empty()
+        if result is None:
+            st.error("The backend closed the stream before sending the chunk totals; try again.")
+            st.stop()
+        st.session_state.setdefault("totals", {})[str(params)] = result["total_chunks"]
+        if result["total_chunks"] > PAGE_SIZE:
+            select_page(result["total_chunks"])
+    else:
+        # Every page after the first pass, page 1 included, comes from the
+        # chunk cache, PAGE_SIZE chunks at a time.
+        page = select_page(known) if known > PAGE_SIZE else 1
+        result = post_chunks(pdf_bytes, {**params, "offset": (page - 1) * PAGE_SIZE, "limit": PAGE_SIZE}).json()
+        if "error" in result:
+            st.error(result["error"])
+            st.stop()
+        summary = st.container()
+        for index, chunk in enumerate(result["chunks"], start=result["offset"]):
+            show_chunk(index, chunk)
 
+    with summary:
         st.success(f"✅ {result['total_chunks']} Chunks Generated")
-        for idx, chunk in enumerate(result["chunks"]):
-            st.markdown(f"### Chunk {idx+1} ({chunk['size']} chars)")
-            st.code(chunk["text"])
+        show_stats(result["stats"])